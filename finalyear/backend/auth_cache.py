@@ -0,0 +1,101 @@
+# backend/auth_cache.py
+"""
+In-process cache for authentication.
+
+get_current_user runs on every API call. Decoded token claims (keyed by a hash
+of the token) and user snapshots (keyed by username) are kept in small
+LRU/TTL caches so hot endpoints skip the JWT decode and the users query.
+
+Updates and deletes of User rows flushed by this process evict the cached
+snapshot immediately. Other worker processes see the change once the TTL
+expires, so keep AUTH_CACHE_TTL short.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from sqlalchemy import event, inspect
+from models import User
+
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+class TTLCache:
+    """LRU cache whose entries also expire after a time-to-live"""
+
+    def __init__(self, max_entries: int = AUTH_CACHE_MAX_ENTRIES, ttl: float = AUTH_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+def token_key(token: str) -> str:
+    # Raw bearer tokens are never kept in memory as cache keys
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def user_snapshot(user: User) -> User:
+    """Detached copy of the fields endpoints read, safe to share across requests"""
+    return User(id=user.id, username=user.username, email=user.email, is_active=user.is_active)
+
+class AuthCache:
+    def __init__(self, max_entries: int = AUTH_CACHE_MAX_ENTRIES, ttl: float = AUTH_CACHE_TTL):
+        self.claims = TTLCache(max_entries, ttl)
+        self.users = TTLCache(max_entries, ttl)
+
+    def get_claims(self, token: str) -> Optional[dict]:
+        return self.claims.get(token_key(token))
+
+    def set_claims(self, token: str, claims: dict):
+        # Never serve claims past the token's own expiry
+        exp = claims.get("exp")
+        ttl = exp - time.time() if exp is not None else None
+        self.claims.set(token_key(token), claims, ttl)
+
+    def get_user(self, username: str) -> Optional[User]:
+        return self.users.get(username)
+
+    def set_user(self, user: User):
+        self.users.set(user.username, user_snapshot(user))
+
+    def invalidate_user(self, username: str):
+        self.users.pop(username)
+
+    def clear(self):
+        self.claims.clear()
+        self.users.clear()
+
+auth_cache = AuthCache()
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(mapper, connection, target: User):
+    # A rename leaves the old username in the attribute history
+    history = inspect(target).attrs.username.history
+    for username in {target.username, *(history.deleted or ())}:
+        auth_cache.invalidate_user(username)
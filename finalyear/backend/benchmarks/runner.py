@@ -0,0 +1,289 @@
+# backend/benchmarks/runner.py
+"""
+Scanner benchmark: runs APISecurityScanner against local target servers
+(benchmarks/target_server.py) at several concurrency levels and reports
+throughput, p50/p99 scan latency, requests per finding, CPU and memory.
+
+Results are saved as JSON so later runs can be compared against them:
+
+    python -m benchmarks.runner --concurrency 1,4,16 --scans 48
+    python -m benchmarks.runner --compare benchmarks/results/baseline.json --max-regression 0.1
+
+Scanner settings read from the environment at import time (SCANNER_HOST_RPS,
+SCANNER_MAX_CONCURRENT_TESTS, ...) can be set with --env NAME=VALUE; note
+that SCANNER_HOST_RPS caps throughput against each target server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from benchmarks.target_server import VULNERABILITIES, TargetConfig
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+SERVER_START_TIMEOUT = 15.0
+
+ENDPOINTS = {"REST": "/rest/items", "SOAP": "/soap", "GraphQL": "/graphql"}
+SOAP_BODY = """<?xml version="1.0"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+<soap:Body><GetItem><id>1</id></GetItem></soap:Body>
+</soap:Envelope>"""
+# Everything but rate_limit, which floods the target and dominates any run
+DEFAULT_TESTS = {
+    "REST": ["sql", "xss", "ssrf"],
+    "SOAP": ["sql", "xss", "ssrf", "xxe"],
+    "GraphQL": ["introspection", "sql", "xss", "dos"]
+}
+# Metrics where a larger value is a regression
+LOWER_IS_BETTER = ("p50_ms", "p99_ms", "cpu_seconds_per_scan", "requests_per_scan", "peak_rss_mb")
+HIGHER_IS_BETTER = ("scans_per_second",)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_servers(count: int, config: TargetConfig) -> List[subprocess.Popen]:
+    servers = []
+    for _ in range(count):
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.target_server", "--port", str(port), "--config", json.dumps(asdict(config))],
+            cwd=BACKEND_DIR,
+            stdout=subprocess.DEVNULL
+        )
+        process.port = port
+        servers.append(process)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    for process in servers:
+        while True:
+            if process.poll() is not None:
+                stop_servers(servers)
+                raise RuntimeError(f"Target server on port {process.port} exited with {process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", process.port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    stop_servers(servers)
+                    raise RuntimeError(f"Target server on port {process.port} did not start")
+                time.sleep(0.1)
+    return servers
+
+def stop_servers(servers: List[subprocess.Popen]):
+    for process in servers:
+        process.terminate()
+    for process in servers:
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def build_targets(servers: List[subprocess.Popen], scans: int, api_types: List[str], tests: Optional[List[str]]):
+    """One target per scan, round-robin over API types and servers (hosts)"""
+    from models import APITestRequest
+
+    targets = []
+    for index in range(scans):
+        api_type = api_types[index % len(api_types)]
+        port = servers[index % len(servers)].port
+        url = f"http://127.0.0.1:{port}{ENDPOINTS[api_type]}"
+        if api_type == "REST":
+            target = APITestRequest(api_type=api_type, url=url, method="GET", params={"id": "1"})
+        elif api_type == "SOAP":
+            target = APITestRequest(api_type=api_type, url=url, method="POST", body=SOAP_BODY, headers={"Content-Type": "text/xml"})
+        else:
+            target = APITestRequest(api_type=api_type, url=url, method="POST")
+        target.tests = tests or DEFAULT_TESTS[api_type]
+        targets.append(target)
+    return targets
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+async def run_level(targets, concurrency: int) -> Dict[str, Any]:
+    """Scan every target with at most concurrency scans at once"""
+    from security_tests.scanner import APISecurityScanner
+    from utils.api_client import client_manager
+    from utils.metrics import REQUESTS_SENT
+
+    scanner = APISecurityScanner()
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    findings = 0
+    incomplete = 0
+
+    async def scan(target):
+        nonlocal findings, incomplete
+        async with slots:
+            started = time.perf_counter()
+            results = await scanner.run_tests(target)
+            latencies.append(time.perf_counter() - started)
+        findings += sum(1 for result in results if result.vulnerable)
+        incomplete += sum(1 for result in results if result.status != "completed")
+
+    requests_before = REQUESTS_SENT.total()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(scan(target) for target in targets))
+    finally:
+        # Fresh connections, throttles and circuit breakers for the next level
+        await client_manager.close()
+    wall = time.perf_counter() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    requests = REQUESTS_SENT.total() - requests_before
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    return {
+        "concurrency": concurrency,
+        "scans": len(targets),
+        "wall_seconds": round(wall, 3),
+        "scans_per_second": round(len(targets) / wall, 3) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "requests": int(requests),
+        "requests_per_scan": round(requests / len(targets), 1) if targets else 0.0,
+        "findings": findings,
+        "requests_per_finding": round(requests / findings, 1) if findings else None,
+        "incomplete_tests": incomplete,
+        "cpu_seconds": round(cpu, 3),
+        "cpu_seconds_per_scan": round(cpu / len(targets), 4) if targets else 0.0,
+        "cpu_utilization": round(cpu / wall, 3) if wall else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: Optional[float]) -> bool:
+    """Print per-level changes against baseline; False if any exceeds max_regression"""
+    ok = True
+    previous = {level["concurrency"]: level for level in baseline["levels"]}
+    print(f"\nCompared with {baseline['meta'].get('git_commit') or 'baseline'} ({baseline['meta'].get('timestamp')})")
+    for level in current["levels"]:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        changes = []
+        for key in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            old, new = before.get(key), level.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if key in HIGHER_IS_BETTER else change
+            flag = ""
+            if max_regression is not None and worse > max_regression:
+                flag = "  REGRESSION"
+                ok = False
+            changes.append(f"    {key:<22} {old:>10} -> {new:<10} {change:+.1%}{flag}")
+        print(f"  concurrency {level['concurrency']}")
+        print("\n".join(changes))
+    return ok
+
+def print_report(report: Dict[str, Any]):
+    columns = ("concurrency", "scans_per_second", "p50_ms", "p99_ms", "requests_per_finding", "cpu_seconds_per_scan", "peak_rss_mb")
+    print("  ".join(f"{column:>20}" for column in columns))
+    for level in report["levels"]:
+        print("  ".join(f"{str(level[column]):>20}" for column in columns))
+
+async def run_levels(targets, levels: List[int]) -> List[Dict[str, Any]]:
+    return [await run_level(targets, concurrency) for concurrency in levels]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the scanner against local target servers")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated numbers of scans in flight")
+    parser.add_argument("--scans", type=int, default=24, help="Targets scanned at each concurrency level")
+    parser.add_argument("--api-types", default="REST,SOAP,GraphQL")
+    parser.add_argument("--tests", default=None, help="Comma-separated tests (default: all but rate_limit)")
+    parser.add_argument("--hosts", type=int, default=1, help="Target servers to spread the scans over")
+    parser.add_argument("--latency-ms", type=float, default=TargetConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=TargetConfig.jitter_ms)
+    parser.add_argument("--response-bytes", type=int, default=TargetConfig.response_bytes)
+    parser.add_argument("--vulns", default=",".join(TargetConfig().vulns), help=f"Comma-separated subset of {', '.join(VULNERABILITIES)}")
+    parser.add_argument("--rate-limit-rps", type=float, default=TargetConfig.rate_limit_rps)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="Scanner setting for this run")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier result file to compare with")
+    parser.add_argument("--max-regression", type=float, default=None, help="Exit non-zero if a metric worsens by more than this fraction")
+    args = parser.parse_args(argv)
+
+    # Scanner modules read their settings on import, so set them first
+    for setting in args.env:
+        name, _, value = setting.partition("=")
+        os.environ[name] = value
+
+    config = TargetConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        response_bytes=args.response_bytes,
+        vulns=[vuln for vuln in args.vulns.split(",") if vuln],
+        rate_limit_rps=args.rate_limit_rps
+    )
+    levels = [int(level) for level in args.concurrency.split(",")]
+    api_types = [api_type for api_type in args.api_types.split(",") if api_type]
+    tests = args.tests.split(",") if args.tests else None
+
+    servers = start_servers(args.hosts, config)
+    try:
+        targets = build_targets(servers, args.scans, api_types, tests)
+        results = asyncio.run(run_levels(targets, levels))
+    finally:
+        stop_servers(servers)
+
+    timestamp = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "timestamp": timestamp.isoformat(),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+            "target": asdict(config),
+            "hosts": args.hosts,
+            "scans": args.scans,
+            "api_types": api_types,
+            "tests": tests,
+            "env": dict(setting.partition("=")[::2] for setting in args.env)
+        },
+        "levels": results
+    }
+    print_report(report)
+
+    output = args.output or os.path.join(RESULTS_DIR, timestamp.strftime("%Y%m%dT%H%M%SZ") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if not compare(report, baseline, args.max_regression):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
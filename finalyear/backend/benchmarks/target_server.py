@@ -0,0 +1,157 @@
+# backend/benchmarks/target_server.py
+"""
+Local stand-in target for scanner benchmarks.
+
+Serves deliberately vulnerable REST, SOAP and GraphQL endpoints with
+configurable latency, jitter, response size, vulnerability mix and rate
+limiting, so scans are reproducible without touching real systems:
+
+    REST     GET  /rest/items?id=1
+    SOAP     POST /soap
+    GraphQL  POST /graphql
+
+Run on its own with:
+    python -m benchmarks.target_server --port 8765 --vulns sql,xss,introspection
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import List, Set
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+# Vulnerabilities the server can simulate
+VULNERABILITIES = ("sql", "sql_time", "xss", "ssrf", "xxe", "introspection")
+SQL_ERROR = "You have an error in your SQL syntax; check the manual that corresponds to your MySQL server version"
+SLEEP_PATTERN = re.compile(r"(?:PG_)?SLEEP\((\d+)\)|WAITFOR DELAY '0:0:(\d+)'|BENCHMARK\((\d+)", re.IGNORECASE)
+MAX_SLEEP = 10.0
+
+@dataclass
+class TargetConfig:
+    latency_ms: float = 20.0  # Mean added latency per response
+    jitter_ms: float = 5.0  # Standard deviation of the added latency
+    response_bytes: int = 2048  # Size of normal responses
+    vulns: List[str] = field(default_factory=lambda: ["sql", "xss", "introspection"])
+    rate_limit_rps: float = 0.0  # Requests per second before answering 429 (0 = no limit)
+    seed: int = 1
+
+class RateLimiter:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+def create_app(config: TargetConfig) -> FastAPI:
+    app = FastAPI()
+    vulns: Set[str] = set(config.vulns)
+    rng = random.Random(config.seed)
+    limiter = RateLimiter(config.rate_limit_rps) if config.rate_limit_rps > 0 else None
+    filler = "x" * config.response_bytes
+
+    async def respond_after_latency():
+        delay = max(0.0, rng.gauss(config.latency_ms, config.jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def injected_sleep(text: str):
+        match = SLEEP_PATTERN.search(text)
+        if match and "sql_time" in vulns:
+            seconds, delay, rounds = match.groups()
+            await asyncio.sleep(min(MAX_SLEEP, float(seconds or delay or 0) or int(rounds or 0) / 1_000_000))
+
+    @app.middleware("http")
+    async def latency_and_rate_limit(request: Request, call_next):
+        if limiter and not limiter.allow():
+            return PlainTextResponse("Too Many Requests", status_code=429, headers={"Retry-After": "1"})
+        await respond_after_latency()
+        return await call_next(request)
+
+    @app.get("/rest/items")
+    async def rest_items(request: Request):
+        values = " ".join(request.query_params.values())
+        await injected_sleep(values)
+        if "sql" in vulns and "'" in values:
+            return PlainTextResponse(SQL_ERROR, status_code=500)
+        if "ssrf" in vulns and ("169.254.169.254" in values or "localhost" in values):
+            return JSONResponse({"fetched": "instance metadata", "ami-id": "ami-12345"})
+        if "xss" in vulns and "<" in values:
+            return Response(f"<html><body>Results for {values}</body></html>", media_type="text/html")
+        return JSONResponse({"items": [{"id": request.query_params.get("id", "1")}], "padding": filler})
+
+    @app.post("/soap")
+    async def soap(request: Request):
+        body = (await request.body()).decode("utf-8", "replace")
+        await injected_sleep(body)
+        if "xxe" in vulns and "<!ENTITY" in body:
+            return Response("<result>root:x:0:0:root:/root:/bin/bash</result>", media_type="text/xml")
+        if "sql" in vulns and "'" in body:
+            return Response(f"<soap:Fault><faultstring>{SQL_ERROR}</faultstring></soap:Fault>", media_type="text/xml", status_code=500)
+        if "ssrf" in vulns and ("169.254.169.254" in body or "localhost" in body):
+            return Response("<result>instance metadata</result>", media_type="text/xml")
+        if "xss" in vulns and "<test>" in body:
+            echoed = body.split("<test>", 1)[1].split("</test>", 1)[0]
+            return Response(f"<result>{echoed}</result>", media_type="text/xml")
+        return Response(f"<result><padding>{filler}</padding></result>", media_type="text/xml")
+
+    @app.post("/graphql")
+    async def graphql(request: Request):
+        try:
+            query = (await request.json()).get("query", "")
+        except (ValueError, AttributeError):
+            return JSONResponse({"errors": [{"message": "Invalid request"}]}, status_code=400)
+        await injected_sleep(query)
+        if "__schema" in query:
+            if "introspection" in vulns:
+                return JSONResponse({"data": {"__schema": {"types": [{"name": "Query"}, {"name": "User"}]}}})
+            return JSONResponse({"errors": [{"message": "Introspection is disabled"}]})
+        if "sql" in vulns and "'" in query:
+            return JSONResponse({"errors": [{"message": SQL_ERROR}]})
+        if "xss" in vulns and "<script>" in query:
+            return JSONResponse({"errors": [{"message": f"Unknown user {query}"}]})
+        return JSONResponse({"data": {"user": {"name": "alice"}}, "padding": filler})
+
+    return app
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the benchmark target server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", default=None, help="TargetConfig as JSON (overrides the flags below)")
+    parser.add_argument("--latency-ms", type=float, default=TargetConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=TargetConfig.jitter_ms)
+    parser.add_argument("--response-bytes", type=int, default=TargetConfig.response_bytes)
+    parser.add_argument("--vulns", default=",".join(TargetConfig().vulns), help=f"Comma-separated subset of {', '.join(VULNERABILITIES)}")
+    parser.add_argument("--rate-limit-rps", type=float, default=TargetConfig.rate_limit_rps)
+    return parser.parse_args(argv)
+
+def config_from_args(args: argparse.Namespace) -> TargetConfig:
+    if args.config:
+        return TargetConfig(**json.loads(args.config))
+    return TargetConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        response_bytes=args.response_bytes,
+        vulns=[vuln for vuln in args.vulns.split(",") if vuln],
+        rate_limit_rps=args.rate_limit_rps
+    )
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    config = config_from_args(args)
+    print(f"Benchmark target on http://{args.host}:{args.port} with {json.dumps(asdict(config))}")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning", access_log=False)
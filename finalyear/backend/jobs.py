@@ -0,0 +1,217 @@
+# backend/jobs.py
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from models import APITestRequest, BatchTargetResult, ScanJobStatus, TestResult
+from security_tests.batch import BatchScanner, interleave_by_host
+from utils.logging_config import configure_logging
+from utils.metrics import JOBS_QUEUED, JOBS_RUNNING
+
+# Background scan job settings
+SCAN_JOB_WORKERS = int(os.getenv("SCAN_JOB_WORKERS", "2"))
+SCAN_JOB_BACKEND = os.getenv("SCAN_JOB_BACKEND", "asyncio")  # "asyncio" or "process"
+SCAN_JOB_PROCESSES = int(os.getenv("SCAN_JOB_PROCESSES", str(os.cpu_count() or 2)))
+MAX_FINISHED_JOBS = int(os.getenv("SCAN_JOB_HISTORY", "1000"))
+
+def _scan_in_process(target_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry point for the process-pool backend: scan one target in a worker process"""
+    from security_tests.scanner import APISecurityScanner, scan_trace_for
+    from utils.api_client import client_manager
+
+    target = APITestRequest(**target_data)
+    trace = scan_trace_for(target)
+
+    async def scan():
+        try:
+            return await APISecurityScanner().run_tests(target, trace=trace)
+        finally:
+            await client_manager.close()
+
+    results = asyncio.run(scan())
+    return {
+        "results": [result.model_dump() for result in results],
+        "trace_id": trace.id if trace else None,
+        "trace": trace.to_chrome() if trace else None
+    }
+
+class ScanJob:
+    def __init__(self, user_id: int, targets: List[APITestRequest]):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.targets = targets
+        self.status = "queued"
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.results: List[BatchTargetResult] = []
+        self.completed_targets = 0
+        self.error: Optional[str] = None
+        # Every progress event in order, so late stream subscribers can replay them
+        self.events: List[Dict[str, Any]] = []
+        self._closed = False
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    async def publish(self, event: str, data: Dict[str, Any], final: bool = False):
+        async with self._changed:
+            self.events.append({"event": event, "data": data})
+            self._closed = final
+            self._changed.notify_all()
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every event of the job, waiting for new ones until it finishes"""
+        position = 0
+        while True:
+            async with self._changed:
+                while position >= len(self.events) and not self._closed:
+                    await self._changed.wait()
+                pending = self.events[position:]
+            for event in pending:
+                yield event
+            position += len(pending)
+            if self._closed and position >= len(self.events):
+                return
+
+    def to_status(self) -> ScanJobStatus:
+        return ScanJobStatus(
+            job_id=self.id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            total_targets=len(self.targets),
+            completed_targets=self.completed_targets,
+            results=self.results,
+            error=self.error
+        )
+
+class JobManager:
+    """In-process queue of scan jobs served by a fixed number of asyncio workers"""
+
+    def __init__(
+        self,
+        workers: int = SCAN_JOB_WORKERS,
+        backend: str = SCAN_JOB_BACKEND,
+        processes: int = SCAN_JOB_PROCESSES
+    ):
+        self.workers = workers
+        self.backend = backend
+        self.processes = processes
+        self.jobs: "OrderedDict[str, ScanJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        if self.backend == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, initializer=configure_logging)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def submit(
+        self,
+        user_id: int,
+        targets: List[APITestRequest],
+        on_target_done: Optional[Callable[[ScanJob, BatchTargetResult], Awaitable[None]]] = None
+    ) -> ScanJob:
+        """Queue a scan and return its job straight away"""
+        if self._queue is None:
+            # Without workers the job would sit in the queue forever
+            raise RuntimeError("JobManager not started")
+        job = ScanJob(user_id, targets)
+        self.jobs[job.id] = job
+        self._prune()
+        self._queue.put_nowait((job, on_target_done))
+        JOBS_QUEUED.inc()
+        return job
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        return self.jobs.get(job_id)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job, on_target_done = await self._queue.get()
+            JOBS_QUEUED.dec()
+            JOBS_RUNNING.inc()
+            try:
+                await self._run(job, on_target_done)
+            finally:
+                JOBS_RUNNING.dec()
+                self._queue.task_done()
+
+    async def _run(self, job: ScanJob, on_target_done):
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        await job.publish("status", {"status": job.status})
+
+        async def result_done(target: APITestRequest, result: TestResult):
+            await job.publish("result", {"url": target.url, "result": result.model_dump()})
+
+        async def target_done(target_result: BatchTargetResult):
+            job.results.append(target_result)
+            job.completed_targets += 1
+            if on_target_done:
+                await on_target_done(job, target_result)
+            await job.publish("target", {
+                "url": target_result.url,
+                "completed_targets": job.completed_targets,
+                "total_targets": len(job.targets)
+            })
+
+        try:
+            if self._pool:
+                await self._run_in_processes(job, result_done, target_done)
+            else:
+                await BatchScanner().run(job.targets, on_target_done=target_done, on_result=result_done)
+            job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        await job.publish("status", {"status": job.status, "error": job.error}, final=True)
+
+    async def _run_in_processes(self, job: ScanJob, result_done, target_done):
+        """Process-pool backend: each target is scanned in a worker process"""
+        loop = asyncio.get_running_loop()
+
+        async def scan(target: APITestRequest):
+            data = await loop.run_in_executor(self._pool, _scan_in_process, target.model_dump())
+            results = [TestResult(**item) for item in data["results"]]
+            # Per-test progress is only known once the whole target comes back
+            for result in results:
+                await result_done(target, result)
+            target_result = BatchTargetResult(
+                api_type=target.api_type,
+                url=target.url,
+                method=target.method,
+                results=results,
+                trace_id=data["trace_id"]
+            )
+            target_result._trace = data["trace"]
+            await target_done(target_result)
+
+        await asyncio.gather(*(scan(job.targets[index]) for index in interleave_by_host(job.targets)))
+
+# Process-wide job manager, started/stopped with the FastAPI app
+job_manager = JobManager()
@@ -1,26 +1,60 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Path, Query, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+import asyncio
+import base64
+import csv
+import io
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
-from models import User, TestResultDB, APITestRequest, TestResult, UserCreate, UserResponse, Token, TokenData, ProtectedResponse, Base
-from security_tests.scanner import APISecurityScanner
+from models import User, TestResultDB, ScanTraceDB, APITestRequest, BatchTestRequest, BatchTargetResult, ScanJobStatus, StoredTestResult, TestResult, UserCreate, UserResponse, Token, TokenData, ProtectedResponse
+from utils.logging_config import configure_logging
+from utils.metrics import REGISTRY
+from utils.tracing import summarize_chrome
+from database import AsyncSessionLocal, SessionLocal, get_db, init_db
+from security_tests.scanner import APISecurityScanner, scan_trace_for
+from security_tests.batch import BatchScanner, expand_batch
+from utils.api_client import client_manager
+from jobs import job_manager
+from rollups import backfill_rollups, dashboard_from_rollups
+from results_store import ResultWriteBehind, result_rows, store_results, store_traces
+from auth_cache import auth_cache
+from retention import RetentionWorker, archived_months, iter_archived_rows, matches_filters
 
-# Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+configure_logging()
+logger = logging.getLogger(__name__)
 
-# Create the database tables
-Base.metadata.create_all(bind=engine)
+# Create the database tables (storage is configured in database.py)
+init_db()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Background scans hand their results to a write-behind queue
+result_writer = ResultWriteBehind(AsyncSessionLocal)
+# Old results are moved out of test_results into compressed monthly archives
+retention_worker = RetentionWorker(SessionLocal)
+
+# Password hashing. Hashes made with a different cost are upgraded on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+# bcrypt is CPU-bound (and releases the GIL), so it runs on a small dedicated
+# pool; a login burst queues there instead of stalling the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
 
 # JWT settings
 SECRET_KEY = "your-secret-key"
@@ -43,26 +77,60 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
-# Dependency to get the database session
-def get_db():
+def run_rollup_backfill():
     db = SessionLocal()
     try:
-        yield db
+        built = backfill_rollups(db)
+        if built:
+            logger.info("Built dashboard rollups", extra={"users": len(built)})
     finally:
         db.close()
 
-# Password hashing utility
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# Shared HTTP connection pool and background scan workers
+@app.on_event("startup")
+async def start_scanner_services():
+    # Dashboard counters for users with history from before the rollup table
+    await asyncio.to_thread(run_rollup_backfill)
+    await client_manager.start()
+    await result_writer.start()
+    await job_manager.start()
+    await retention_worker.start()
+
+@app.on_event("shutdown")
+async def stop_scanner_services():
+    await retention_worker.stop()
+    await job_manager.stop()
+    await result_writer.stop()
+    await client_manager.close()
+    password_executor.shutdown(wait=False)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+# Password hashing utility (runs on the bcrypt pool)
+async def verify_and_update_password(plain_password, hashed_password):
+    """(valid, new_hash); new_hash is set when the stored hash should be upgraded"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+# Look up a user by username
+async def get_user_by_username(db: AsyncSession, username: str):
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
 
 # Authenticate user
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db, username)
+    if not user:
         return False
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        return False
+    if new_hash:
+        # Stored hash used another cost (or scheme); replace it now the password is known
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 # Create JWT token
@@ -77,23 +145,32 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 # Get current user from JWT token
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    # Decoded claims and user records are cached (see auth_cache.py)
+    payload = auth_cache.get_claims(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
             raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        auth_cache.set_claims(token, payload)
+    username: str = payload.get("sub")
+    if username is None:
         raise credentials_exception
+    token_data = TokenData(username=username)
 
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = auth_cache.get_user(token_data.username)
     if user is None:
+        user = await get_user_by_username(db, token_data.username)
+        if user is None:
+            raise credentials_exception
+        auth_cache.set_user(user)
+    if user.is_active is False:
         raise credentials_exception
     return user
 
@@ -107,18 +184,18 @@ class Token(BaseModel):
 @app.post("/api/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    print(f"Login attempt for username: {form_data.username}")
-    user = authenticate_user(db, form_data.username, form_data.password)
+    logger.info("login attempt", extra={"username": form_data.username})
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
-        print("Authentication failed: Incorrect username or password")
+        logger.info("login failed", extra={"username": form_data.username})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    print(f"User authenticated: {user.username}, email: {user.email}, id: {user.id}")
+    logger.info("login succeeded", extra={"username": user.username, "user_id": user.id})
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, 
@@ -134,7 +211,6 @@ async def login(
             "id": user.id
         }
     }
-    print(f"Login response: {response}")
     return response
 
 # Protected endpoint
@@ -144,9 +220,9 @@ async def protected_route(current_user: User = Depends(get_current_user)):
 
 # Signup endpoint
 @app.post("/api/signup", response_model=UserResponse)
-async def signup(user: UserCreate, db: Session = Depends(get_db)):
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if username already exists
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await get_user_by_username(db, user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -154,7 +230,7 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if email already exists
-    db_email = db.query(User).filter(User.email == user.email).first()
+    db_email = (await db.execute(select(User).where(User.email == user.email))).scalars().first()
     if db_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -162,18 +238,18 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     try:
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await get_password_hash(user.password)
         db_user = User(
             username=user.username,
             email=user.email,
             hashed_password=hashed_password
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -181,8 +257,8 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
 
 # Debug endpoint to list users
 @app.get("/debug/users")
-def get_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+async def get_users(db: AsyncSession = Depends(get_db)):
+    return (await db.execute(select(User))).scalars().all()
 
 # Token verification endpoint
 @app.post("/api/verify-token")
@@ -206,30 +282,111 @@ async def verify_token(token: str = Depends(oauth2_scheme)):
 @app.post("/api/run-tests", response_model=List[TestResult])
 async def run_security_tests(
     test_request: APITestRequest,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     scanner = APISecurityScanner()
-    results = await scanner.run_tests(test_request)
+    trace = scan_trace_for(test_request)
+    results = await scanner.run_tests(test_request, trace=trace)
     
     # Store results in the database
-    for result in results:
-        db_result = TestResultDB(
-            user_id=current_user.id,
-            test_name=result.test_name,
-            api_type=test_request.api_type,
-            url=test_request.url,
-            vulnerable=result.vulnerable,
-            confidence=result.confidence,
-            description=result.description,
-            payload=result.payload,
-            recommendation=result.recommendation
-        )
-        db.add(db_result)
-    db.commit()
+    target_result = BatchTargetResult(
+        api_type=test_request.api_type,
+        url=test_request.url,
+        method=test_request.method,
+        results=results,
+        trace_id=trace.id if trace else None
+    )
+    if trace:
+        target_result._trace = trace.to_chrome()
+        response.headers["X-Trace-Id"] = trace.id
+    await store_results(db, current_user.id, [target_result])
     
     return results
 
+# Endpoint to run security tests against many endpoints in one call
+@app.post("/api/run-tests/batch", response_model=List[BatchTargetResult])
+async def run_batch_security_tests(
+    batch_request: BatchTestRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        targets = expand_batch(batch_request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read API specification: {str(e)}"
+        )
+    if not targets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No targets to scan"
+        )
+    
+    batch_results = await BatchScanner().run(targets)
+    
+    # Store all results through the bulk write path
+    await store_results(db, current_user.id, batch_results)
+    
+    return batch_results
+
+# Background scan jobs: submit returns immediately, progress is polled or streamed
+@app.post("/api/jobs", response_model=ScanJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def submit_scan_job(
+    batch_request: BatchTestRequest,
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        targets = expand_batch(batch_request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read API specification: {str(e)}"
+        )
+    if not targets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No targets to scan"
+        )
+    
+    async def save_target(job, target_result: BatchTargetResult):
+        if target_result.trace_id:
+            async with AsyncSessionLocal() as db:
+                await store_traces(db, job.user_id, [target_result])
+        await result_writer.add(result_rows(job.user_id, [target_result]))
+    
+    job = job_manager.submit(current_user.id, targets, on_target_done=save_target)
+    return job.to_status()
+
+def get_user_job(job_id: str, current_user: User):
+    job = job_manager.get(job_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@app.get("/api/jobs/{job_id}", response_model=ScanJobStatus)
+async def get_scan_job(job_id: str, current_user: User = Depends(get_current_user)):
+    return get_user_job(job_id, current_user).to_status()
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_scan_job(job_id: str, current_user: User = Depends(get_current_user)):
+    job = get_user_job(job_id, current_user)
+    
+    async def event_stream():
+        async for event in job.stream():
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Vulnerable test endpoint (for testing purposes)
 @app.get("/vulnerable-test")
 async def vulnerable_test(id: str):
@@ -238,62 +395,192 @@ async def vulnerable_test(id: str):
         return {"error": "SQL syntax error near..."}
     return {"result": "ok"}
 
-# Endpoint to fetch test results for the dashboard
-@app.get("/api/results", response_model=List[TestResult])
-def get_test_results(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    results = db.query(TestResultDB).filter(TestResultDB.user_id == current_user.id).all()
-    return [
-        TestResult(
-            test_name=result.test_name,
-            vulnerable=result.vulnerable,
-            confidence=result.confidence,
-            description=result.description,
-            payload=result.payload,
-            recommendation=result.recommendation
+# Filters shared by the results listing and export endpoints
+def result_filters(
+    vulnerable: Optional[bool] = None,
+    test_name: Optional[str] = None,
+    api_type: Optional[str] = None,
+    url: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> dict:
+    return {
+        "vulnerable": vulnerable,
+        "test_name": test_name,
+        "api_type": api_type,
+        "url": url,
+        "created_from": created_from,
+        "created_to": created_to
+    }
+
+def filtered_results_query(user_id: int, filters: dict):
+    query = select(TestResultDB).where(TestResultDB.user_id == user_id)
+    if filters["vulnerable"] is not None:
+        query = query.where(TestResultDB.vulnerable == filters["vulnerable"])
+    for column in ("test_name", "api_type", "url"):
+        if filters[column] is not None:
+            query = query.where(getattr(TestResultDB, column) == filters[column])
+    if filters["created_from"] is not None:
+        query = query.where(TestResultDB.created_at >= filters["created_from"])
+    if filters["created_to"] is not None:
+        query = query.where(TestResultDB.created_at < filters["created_to"])
+    return query.order_by(TestResultDB.created_at, TestResultDB.id)
+
+def encode_cursor(result: TestResultDB) -> str:
+    return base64.urlsafe_b64encode(f"{result.created_at.isoformat()}|{result.id}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, result_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(result_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
-        for result in results
-    ]
 
-# Endpoint for dashboard stats
-@app.get("/api/dashboard")
-def get_dashboard_stats(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    results = db.query(TestResultDB).filter(TestResultDB.user_id == current_user.id).all()
-    
-    total_tests = len(results)
-    vulnerabilities = sum(1 for r in results if r.vulnerable)
-    workflows = 1  # Placeholder, you can implement logic for workflows
+def stored_result(result: TestResultDB) -> dict:
+    return {
+        "id": result.id,
+        "test_name": result.test_name,
+        "api_type": result.api_type,
+        "url": result.url,
+        "vulnerable": result.vulnerable,
+        "confidence": result.confidence,
+        "description": result.description,
+        "payload": result.payload,
+        "recommendation": result.recommendation,
+        "status": result.status or "completed",
+        "trace_id": result.trace_id,
+        "created_at": result.created_at
+    }
+
+# Endpoint to fetch test results for the dashboard, one page at a time.
+# The cursor for the next page is returned in the X-Next-Cursor header.
+@app.get("/api/results", response_model=List[StoredTestResult])
+async def get_test_results(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    filters: dict = Depends(result_filters),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    query = filtered_results_query(current_user.id, filters)
+    if cursor:
+        # Keyset pagination: continue after the last (created_at, id) seen
+        query = query.where(tuple_(TestResultDB.created_at, TestResultDB.id) > tuple_(*decode_cursor(cursor)))
+    results = (await db.execute(query.limit(limit + 1))).scalars().all()
+    if len(results) > limit:
+        results = results[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(results[-1])
+    return [stored_result(result) for result in results]
+
+# Streaming export of all matching results as NDJSON or CSV
+@app.get("/api/results/export")
+async def export_test_results(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    filters: dict = Depends(result_filters),
+    current_user: User = Depends(get_current_user)
+):
+    user_id = current_user.id
+    columns = ["id", "test_name", "api_type", "url", "vulnerable", "confidence",
+               "description", "payload", "recommendation", "status", "created_at"]
     
-    # Categorize vulnerabilities by severity (based on confidence)
-    critical = sum(1 for r in results if r.vulnerable and r.confidence >= 0.9)
-    high = sum(1 for r in results if r.vulnerable and 0.7 <= r.confidence < 0.9)
-    medium = sum(1 for r in results if r.vulnerable and 0.5 <= r.confidence < 0.7)
-    low = sum(1 for r in results if r.vulnerable and r.confidence < 0.5)
+    async def rows():
+        # The stream outlives the request's session, so it uses its own
+        async with AsyncSessionLocal() as db:
+            query = filtered_results_query(user_id, filters).execution_options(yield_per=1000)
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+            async for result in await db.stream_scalars(query):
+                row = stored_result(result)
+                if format == "csv":
+                    writer.writerow([row[column] for column in columns])
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                else:
+                    yield json.dumps(row, default=str) + "\n"
+            if format == "csv" and buffer.getvalue():
+                yield buffer.getvalue()
     
-    # Group by test name for categories chart
-    categories = {}
-    for r in results:
-        if r.vulnerable:
-            categories[r.test_name] = categories.get(r.test_name, 0) + 1
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=test_results.{format}"}
+    )
+
+# A stored scan trace of the user, or 404
+async def get_user_trace(db: AsyncSession, trace_id: str, user_id: int) -> dict:
+    trace = (await db.execute(
+        select(ScanTraceDB).where(ScanTraceDB.id == trace_id, ScanTraceDB.user_id == user_id)
+    )).scalars().first()
+    if trace is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trace not found"
+        )
+    return json.loads(trace.trace)
+
+# Execution trace of a traced scan, in Chrome trace format (open in Perfetto or chrome://tracing)
+@app.get("/api/traces/{trace_id}")
+async def get_scan_trace(trace_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    chrome = await get_user_trace(db, trace_id, current_user.id)
+    return Response(
+        json.dumps(chrome),
+        media_type="application/json",
+        headers={"Content-Disposition": f"attachment; filename=trace-{trace_id}.json"}
+    )
+
+# Where a traced scan spent its time: target round trips vs our own detection code
+@app.get("/api/traces/{trace_id}/summary")
+async def get_scan_trace_summary(trace_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return summarize_chrome(await get_user_trace(db, trace_id, current_user.id))
+
+# Scanner metrics in the Prometheus text format (requests, tests, scans, jobs)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+# Months of archived results (older than the retention window)
+@app.get("/api/results/archive")
+async def list_archived_results(current_user: User = Depends(get_current_user)):
+    # Lists the archive directory, so keep it off the event loop
+    return await asyncio.to_thread(archived_months, current_user.id)
+
+# One month of archived results as NDJSON, decompressed on demand
+@app.get("/api/results/archive/{month}")
+async def export_archived_results(
+    month: str = Path(..., pattern=r"^\d{4}-\d{2}$"),
+    filters: dict = Depends(result_filters),
+    current_user: User = Depends(get_current_user)
+):
+    user_id = current_user.id
+    months = await asyncio.to_thread(archived_months, user_id)
+    if month not in {entry["month"] for entry in months}:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No archived results for this month"
+        )
     
-    # Group by month for timeline chart
-    timeline = {}
-    for r in results:
-        month = r.created_at.strftime("%B")
-        timeline[month] = timeline.get(month, 0) + (1 if r.vulnerable else 0)
+    def rows():
+        # Sync generator: Starlette iterates it in a worker thread
+        for row in iter_archived_rows(user_id, month):
+            if matches_filters(row, filters):
+                row.pop("user_id")
+                yield json.dumps(row, default=str) + "\n"
     
-    return {
-        "stats": {
-            "total_tests": total_tests,
-            "vulnerabilities": vulnerabilities,
-            "tests": total_tests,
-            "workflows": workflows
-        },
-        "risk_levels": {
-            "critical": critical,
-            "high": high,
-            "medium": medium,
-            "low": low
-        },
-        "categories": categories,
-        "timeline": timeline
-    }
\ No newline at end of file
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=test_results-{month}.ndjson"}
+    )
+
+# Endpoint for dashboard stats
+@app.get("/api/dashboard")
+async def get_dashboard_stats(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # Counters are kept up to date on write and backfilled at startup
+    return await db.run_sync(dashboard_from_rollups, current_user.id)
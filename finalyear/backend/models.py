@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, List
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Optional, Dict, List, Any, Literal
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, Index, Text, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -27,9 +27,51 @@ class TestResultDB(Base):
     description = Column(String)
     payload = Column(String, nullable=True)
     recommendation = Column(String)
+    status = Column(String, default="completed", server_default="completed")  # completed, unreachable, timed_out
+    trace_id = Column(String, nullable=True)  # Scan trace, when the scan was traced
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Dashboard and results queries filter by user, then by date or outcome
+        Index("ix_test_results_user_created", "user_id", "created_at"),
+        Index("ix_test_results_user_vulnerable_test", "user_id", "vulnerable", "test_name"),
+    )
+
+class ScanTraceDB(Base):
+    """Execution trace of one traced scan of one target (Chrome trace JSON)"""
+    __tablename__ = "scan_traces"
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, index=True)
+    api_type = Column(String)
+    url = Column(String)
+    duration_ms = Column(Float)
+    trace = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class DashboardRollupDB(Base):
+    """Per-user dashboard counters, kept up to date as results are stored"""
+    __tablename__ = "dashboard_rollups"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True)
+    dimension = Column(String)  # total, severity, test_name, api_type, month
+    key = Column(String)
+    total = Column(Integer, default=0)
+    vulnerable = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "dimension", "key", name="uq_dashboard_rollups_user_dimension_key"),
+    )
+
 # Pydantic models for request/response validation
+class RateLimitConfig(BaseModel):
+    model: Literal["open", "closed"] = "open"  # "open": fixed arrival rate, "closed": fixed number of concurrent clients
+    start_rps: float = Field(10.0, gt=0)  # Arrival rate at the start of the ramp (open model)
+    end_rps: float = Field(100.0, gt=0)  # Arrival rate at the end of the ramp (open model)
+    duration: float = Field(5.0, gt=0)  # Seconds
+    concurrency: int = Field(50, ge=1)  # Max requests in flight (open) or number of clients (closed)
+    max_requests: int = Field(300, ge=1)
+    stop_on_limit: bool = True  # Stop as soon as the target starts rate limiting
+
 class APITestRequest(BaseModel):
     api_type: str  # "REST", "SOAP", "GraphQL"
     url: str
@@ -39,6 +81,9 @@ class APITestRequest(BaseModel):
     body: Optional[str] = None
     auth: Optional[Dict[str, str]] = None
     tests: List[str] = ["sql", "xss", "ssrf", "rate_limit"]
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    time_budget: Optional[float] = None  # Seconds for the whole scan (default: SCAN_TIME_BUDGET, 0 = unlimited)
+    trace: bool = False  # Record an execution trace of the scan
 
 class TestResult(BaseModel):
     test_name: str
@@ -47,6 +92,43 @@ class TestResult(BaseModel):
     description: str
     payload: Optional[str] = None
     recommendation: str
+    status: str = "completed"  # completed, unreachable (target down), timed_out (scan budget used up)
+
+class StoredTestResult(TestResult):
+    id: int
+    api_type: str
+    url: str
+    trace_id: Optional[str] = None
+    created_at: datetime
+
+class BatchTestRequest(BaseModel):
+    targets: List[APITestRequest] = []
+    openapi_spec: Optional[Dict[str, Any]] = None  # OpenAPI document to derive REST targets from
+    wsdl: Optional[str] = None  # WSDL document to derive SOAP targets from
+    base_url: Optional[str] = None  # Overrides the server URL found in the spec
+    headers: Dict[str, str] = {}  # Applied to targets derived from a spec
+    tests: List[str] = ["sql", "xss", "ssrf", "rate_limit"]
+    trace: bool = False  # Record an execution trace for every target
+
+class BatchTargetResult(BaseModel):
+    api_type: str
+    url: str
+    method: str
+    results: List[TestResult]
+    trace_id: Optional[str] = None
+    # Chrome trace JSON of a traced scan, stored with the results but not returned
+    _trace: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
+class ScanJobStatus(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed, failed
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    total_targets: int
+    completed_targets: int
+    results: List[BatchTargetResult] = []
+    error: Optional[str] = None
 
 class UserCreate(BaseModel):
     username: str
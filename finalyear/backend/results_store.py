@@ -0,0 +1,165 @@
+# backend/results_store.py
+"""
+Bulk write path for scan results.
+
+Rows are inserted with one executemany INSERT per chunk, and each chunk is
+committed on its own so the SQLite write lock is only held briefly. Background
+scans hand their rows to a write-behind queue that flushes on size or time.
+"""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Callable, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import BatchTargetResult, ScanTraceDB, TestResultDB
+from rollups import apply_rollups
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT/commit
+RESULT_BATCH_SIZE = int(os.getenv("RESULT_BATCH_SIZE", "500"))
+# Write-behind queue flushes once it holds this many rows, or after this many seconds
+WRITE_BEHIND_MAX_ROWS = int(os.getenv("RESULT_WRITE_BEHIND_MAX_ROWS", "1000"))
+WRITE_BEHIND_INTERVAL = float(os.getenv("RESULT_WRITE_BEHIND_INTERVAL", "2.0"))
+# Rows kept for a retry while the database is failing; the oldest are dropped beyond this
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("RESULT_WRITE_BEHIND_MAX_PENDING", "100000"))
+
+def result_rows(user_id: int, target_results: List[BatchTargetResult], created_at: Optional[datetime] = None) -> List[dict]:
+    """test_results rows for a user's scan results"""
+    created_at = created_at or datetime.utcnow()
+    return [
+        {
+            "user_id": user_id,
+            "test_name": result.test_name,
+            "api_type": target.api_type,
+            "url": target.url,
+            "vulnerable": result.vulnerable,
+            "confidence": result.confidence,
+            "description": result.description,
+            "payload": result.payload,
+            "recommendation": result.recommendation,
+            "status": result.status,
+            "trace_id": target.trace_id,
+            "created_at": created_at
+        }
+        for target in target_results
+        for result in target.results
+    ]
+
+def trace_rows(user_id: int, target_results: List[BatchTargetResult], created_at: Optional[datetime] = None) -> List[dict]:
+    """scan_traces rows for the traced targets among a user's scan results"""
+    created_at = created_at or datetime.utcnow()
+    rows = []
+    for target in target_results:
+        chrome = target._trace
+        if target.trace_id is None or chrome is None:
+            continue
+        scan = next((event for event in chrome["traceEvents"] if event["cat"] == "scan"), None)
+        rows.append({
+            "id": target.trace_id,
+            "user_id": user_id,
+            "api_type": target.api_type,
+            "url": target.url,
+            "duration_ms": scan["dur"] / 1000 if scan else None,
+            "trace": json.dumps(chrome),
+            "created_at": created_at
+        })
+    return rows
+
+async def store_traces(db: AsyncSession, user_id: int, target_results: List[BatchTargetResult]):
+    """Write the execution traces of traced scans (if any)"""
+    rows = trace_rows(user_id, target_results)
+    if rows:
+        await db.execute(insert(ScanTraceDB), rows)
+        await db.commit()
+
+def insert_result_chunk(db: Session, rows: List[dict]):
+    """One executemany INSERT plus the matching rollup update (caller commits)"""
+    db.execute(insert(TestResultDB), rows)
+    apply_rollups(db, rows)
+
+def bulk_insert_results(db: Session, rows: List[dict], batch_size: int = RESULT_BATCH_SIZE):
+    """Insert rows in chunks with a sync session, committing each chunk"""
+    for start in range(0, len(rows), batch_size):
+        insert_result_chunk(db, rows[start:start + batch_size])
+        db.commit()
+
+async def bulk_insert_results_async(db: AsyncSession, rows: List[dict], batch_size: int = RESULT_BATCH_SIZE):
+    """Insert rows in chunks with an async session, committing each chunk"""
+    for start in range(0, len(rows), batch_size):
+        await db.run_sync(insert_result_chunk, rows[start:start + batch_size])
+        await db.commit()
+
+async def store_results(db: AsyncSession, user_id: int, target_results: List[BatchTargetResult]):
+    """Write scan results (and their traces) for a user"""
+    await store_traces(db, user_id, target_results)
+    await bulk_insert_results_async(db, result_rows(user_id, target_results))
+
+class ResultWriteBehind:
+    """Buffers result rows from background scans and writes them in bulk"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_rows: int = WRITE_BEHIND_MAX_ROWS,
+        interval: float = WRITE_BEHIND_INTERVAL,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING
+    ):
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.interval = interval
+        self.max_pending = max_pending
+        self._rows: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def add(self, rows: List[dict]):
+        self._rows.extend(rows)
+        if len(self._rows) >= self.max_rows:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            rows, self._rows = self._rows, []
+            written = 0
+            try:
+                if rows:
+                    async with self.session_factory() as db:
+                        for start in range(0, len(rows), RESULT_BATCH_SIZE):
+                            chunk = rows[start:start + RESULT_BATCH_SIZE]
+                            await db.run_sync(insert_result_chunk, chunk)
+                            await db.commit()
+                            written += len(chunk)
+            except BaseException:
+                # Chunks already committed stay written; the rest go back to the front for the next flush
+                self._requeue(rows[written:])
+                raise
+
+    def _requeue(self, rows: List[dict]):
+        self._rows = rows + self._rows
+        overflow = len(self._rows) - self.max_pending
+        if overflow > 0:
+            del self._rows[:overflow]
+            logger.error("Dropped %d scan results: write-behind queue is full", overflow)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write scan results, will retry")
@@ -0,0 +1,222 @@
+# backend/retention.py
+"""
+Retention and archival for test_results.
+
+Retention is opt-in: with RESULT_RETENTION_DAYS set (e.g. 90), results older
+than that are moved out of the hot table into compressed monthly archives, one
+file per user and month:
+
+    ARCHIVE_DIR/<user_id>/<YYYY-MM>.ndjson.zst   (zstandard installed)
+    ARCHIVE_DIR/<user_id>/<YYYY-MM>.ndjson.gz    (otherwise)
+
+Each compaction run appends one compressed frame/member per file, so files
+stay readable while they grow. Dashboard rollups are left untouched (and
+rollup rebuilds read the archive), so the dashboard keeps counting archived
+history.
+
+Run a compaction by hand with:
+    python retention.py compact [--days DAYS]
+"""
+import argparse
+import asyncio
+import gzip
+import io
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from models import ScanTraceDB, TestResultDB
+
+try:
+    import zstandard
+except ImportError:  # gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Results older than this many days leave the hot table (0, the default, disables retention)
+RESULT_RETENTION_DAYS = int(os.getenv("RESULT_RETENTION_DAYS", "0"))
+ARCHIVE_DIR = os.getenv("RESULT_ARCHIVE_DIR", "./archive")
+# Rows moved per archive write + delete + commit
+ARCHIVE_BATCH_SIZE = int(os.getenv("RESULT_ARCHIVE_BATCH_SIZE", "5000"))
+# Seconds between background compaction runs
+RETENTION_INTERVAL = float(os.getenv("RESULT_RETENTION_INTERVAL", "3600"))
+
+ARCHIVE_COLUMNS = ["id", "user_id", "test_name", "api_type", "url", "vulnerable", "confidence",
+                   "description", "payload", "recommendation", "status", "trace_id", "created_at"]
+ARCHIVE_SUFFIXES = (".ndjson.zst", ".ndjson.gz")
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+
+def archive_suffix() -> str:
+    return ".ndjson.zst" if zstandard else ".ndjson.gz"
+
+def archive_path(user_id: int, month: str, suffix: Optional[str] = None) -> str:
+    return os.path.join(ARCHIVE_DIR, str(user_id), month + (suffix or archive_suffix()))
+
+def compress(data: bytes, suffix: str) -> bytes:
+    if suffix.endswith(".zst"):
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def open_archive(path: str):
+    """Text stream over an archive file, across every appended frame/member"""
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} needs the zstandard package to be read")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+def archive_row(result: TestResultDB) -> dict:
+    row = {column: getattr(result, column) for column in ARCHIVE_COLUMNS}
+    row["created_at"] = result.created_at.isoformat()
+    return row
+
+def write_archive(user_id: int, month: str, rows: List[dict]):
+    """Append rows to the user's archive for month"""
+    suffix = archive_suffix()
+    path = archive_path(user_id, month, suffix)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+    with open(path, "ab") as archive:
+        archive.write(compress(data, suffix))
+        archive.flush()
+        os.fsync(archive.fileno())
+
+def compact_results(db: Session, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move results created before cutoff into the archive; returns rows moved"""
+    moved = 0
+    while True:
+        batch = db.execute(
+            select(TestResultDB)
+            .where(TestResultDB.created_at < cutoff)
+            .order_by(TestResultDB.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not batch:
+            return moved
+
+        grouped: Dict[Tuple[int, str], List[dict]] = defaultdict(list)
+        for result in batch:
+            grouped[(result.user_id, result.created_at.strftime("%Y-%m"))].append(archive_row(result))
+        # Archive first, then delete: a crash in between leaves duplicates,
+        # which readers drop by id, never lost rows
+        for (user_id, month), rows in grouped.items():
+            write_archive(user_id, month, rows)
+        db.execute(
+            delete(TestResultDB).where(TestResultDB.id.in_([result.id for result in batch])),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        moved += len(batch)
+
+def run_retention(session_factory, retention_days: int = RESULT_RETENTION_DAYS) -> int:
+    """One compaction pass with the configured policy"""
+    if retention_days <= 0:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    db = session_factory()
+    try:
+        moved = compact_results(db, cutoff)
+        # Traces are diagnostics, not history: they are dropped rather than archived
+        db.execute(delete(ScanTraceDB).where(ScanTraceDB.created_at < cutoff))
+        db.commit()
+        return moved
+    finally:
+        db.close()
+
+def archived_user_ids() -> List[int]:
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    return sorted(int(name) for name in os.listdir(ARCHIVE_DIR) if name.isdigit())
+
+def archived_months(user_id: int) -> List[dict]:
+    """Archive files available for a user, oldest first"""
+    directory = os.path.join(ARCHIVE_DIR, str(user_id))
+    if not os.path.isdir(directory):
+        return []
+    months = []
+    for name in sorted(os.listdir(directory)):
+        for suffix in ARCHIVE_SUFFIXES:
+            if name.endswith(suffix) and MONTH_PATTERN.match(name[:-len(suffix)]):
+                path = os.path.join(directory, name)
+                months.append({"month": name[:-len(suffix)], "format": suffix.lstrip("."), "bytes": os.path.getsize(path)})
+    return months
+
+def iter_archived_rows(user_id: int, month: Optional[str] = None) -> Iterator[dict]:
+    """Archived rows for a user (one month, or all of them), decompressed on demand"""
+    for entry in archived_months(user_id):
+        if month is not None and entry["month"] != month:
+            continue
+        seen = set()
+        with open_archive(archive_path(user_id, entry["month"], "." + entry["format"])) as archive:
+            for line in archive:
+                row = json.loads(line)
+                if row["id"] in seen:
+                    continue
+                seen.add(row["id"])
+                row["created_at"] = datetime.fromisoformat(row["created_at"])
+                row.setdefault("status", "completed")
+                row.setdefault("trace_id", None)
+                yield row
+
+def matches_filters(row: dict, filters: dict) -> bool:
+    """Same filters as /api/results, applied to an archived row"""
+    if filters.get("vulnerable") is not None and row["vulnerable"] != filters["vulnerable"]:
+        return False
+    for column in ("test_name", "api_type", "url"):
+        if filters.get(column) is not None and row[column] != filters[column]:
+            return False
+    if filters.get("created_from") is not None and row["created_at"] < filters["created_from"]:
+        return False
+    if filters.get("created_to") is not None and row["created_at"] >= filters["created_to"]:
+        return False
+    return True
+
+class RetentionWorker:
+    """Runs compaction in the background on a fixed interval"""
+
+    def __init__(self, session_factory, interval: float = RETENTION_INTERVAL):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if RESULT_RETENTION_DAYS > 0:
+            self._task = asyncio.create_task(self._compact_periodically())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _compact_periodically(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # File and sync database work stays off the event loop
+                moved = await loop.run_in_executor(None, run_retention, self.session_factory)
+                if moved:
+                    logger.info("archived test results", extra={"rows": moved})
+            except Exception:
+                logger.exception("Failed to archive test results")
+            await asyncio.sleep(self.interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old test results")
+    parser.add_argument("command", choices=["compact"])
+    parser.add_argument(
+        "--days", type=int, default=RESULT_RETENTION_DAYS or None, required=not RESULT_RETENTION_DAYS,
+        help="Archive results older than this many days (default: RESULT_RETENTION_DAYS)"
+    )
+    args = parser.parse_args()
+
+    from database import SessionLocal
+    moved = run_retention(SessionLocal, args.days)
+    print(f"Archived {moved} test results older than {args.days} days")
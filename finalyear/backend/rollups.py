@@ -0,0 +1,217 @@
+# backend/rollups.py
+"""
+Materialized dashboard counters.
+
+Every stored result increments per-user counters (overall, by severity bucket,
+test name, API type and month) in the same transaction as the insert, so
+/api/dashboard reads a handful of rows regardless of history size. Counters
+are upserted (INSERT ... ON CONFLICT DO UPDATE), so concurrent writers never
+race on a new counter row. Users with history from before the rollup table
+get their counters built once at startup (backfill_rollups).
+
+Rebuild from test_results after a backfill with:
+    python rollups.py rebuild [--user USER_ID]
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, case, and_, extract
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import DashboardRollupDB, TestResultDB
+from retention import archived_user_ids, iter_archived_rows
+
+TOTAL_KEY = "all"
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def severity_bucket(confidence: Optional[float]) -> Optional[str]:
+    """Severity of a vulnerable result (based on confidence)"""
+    if confidence is None:
+        return None
+    if confidence >= 0.9:
+        return "critical"
+    if confidence >= 0.7:
+        return "high"
+    if confidence >= 0.5:
+        return "medium"
+    return "low"
+
+def month_key(created_at: datetime) -> str:
+    return created_at.strftime("%Y-%m")
+
+def rollup_increments(rows: Iterable[dict]) -> Dict[Tuple[int, str, str], List[int]]:
+    """Counter increments ([total, vulnerable]) for a set of test_results rows"""
+    increments: Dict[Tuple[int, str, str], List[int]] = defaultdict(lambda: [0, 0])
+
+    def bump(user_id: int, dimension: str, key: str, vulnerable: bool):
+        counts = increments[(user_id, dimension, key)]
+        counts[0] += 1
+        counts[1] += 1 if vulnerable else 0
+
+    for row in rows:
+        user_id, vulnerable = row["user_id"], bool(row["vulnerable"])
+        bump(user_id, "total", TOTAL_KEY, vulnerable)
+        bump(user_id, "test_name", row["test_name"], vulnerable)
+        bump(user_id, "api_type", row["api_type"], vulnerable)
+        bump(user_id, "month", month_key(row["created_at"]), vulnerable)
+        severity = severity_bucket(row["confidence"])
+        if vulnerable and severity:
+            bump(user_id, "severity", severity, vulnerable)
+    return increments
+
+def apply_rollups(db: Session, rows: Iterable[dict]):
+    """Add rows to the counters; call right after inserting them, in the same transaction"""
+    values = [
+        {"user_id": user_id, "dimension": dimension, "key": key, "total": total, "vulnerable": vulnerable}
+        for (user_id, dimension, key), (total, vulnerable) in rollup_increments(rows).items()
+    ]
+    if not values:
+        return
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        _update_then_insert(db, values)
+    else:
+        statement = dialect_insert(DashboardRollupDB)
+        statement = statement.on_conflict_do_update(
+            index_elements=[DashboardRollupDB.user_id, DashboardRollupDB.dimension, DashboardRollupDB.key],
+            set_={
+                "total": DashboardRollupDB.total + statement.excluded.total,
+                "vulnerable": DashboardRollupDB.vulnerable + statement.excluded.vulnerable
+            }
+        )
+        db.execute(statement, values)
+    db.flush()
+
+def _update_then_insert(db: Session, values: List[dict]):
+    """Counter update for databases without ON CONFLICT (not safe against concurrent writers)"""
+    for value in values:
+        updated = db.query(DashboardRollupDB).filter(
+            DashboardRollupDB.user_id == value["user_id"],
+            DashboardRollupDB.dimension == value["dimension"],
+            DashboardRollupDB.key == value["key"]
+        ).update({
+            DashboardRollupDB.total: DashboardRollupDB.total + value["total"],
+            DashboardRollupDB.vulnerable: DashboardRollupDB.vulnerable + value["vulnerable"]
+        }, synchronize_session=False)
+        if not updated:
+            db.add(DashboardRollupDB(**value))
+
+def backfill_rollups(db: Session) -> List[int]:
+    """Build counters for users with results (stored or archived) but none yet; returns their ids"""
+    with_results = {user_id for (user_id,) in db.query(TestResultDB.user_id).distinct()}
+    with_results.update(archived_user_ids())
+    with_rollups = {user_id for (user_id,) in db.query(DashboardRollupDB.user_id).distinct()}
+    built = []
+    for user_id in sorted(with_results - with_rollups):
+        try:
+            rebuild_rollups(db, user_id)
+            db.commit()
+            built.append(user_id)
+        except IntegrityError:
+            # Another worker process built this user's counters first
+            db.rollback()
+    return built
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None):
+    """Recompute counters from test_results and the archive (for one user, or everyone)"""
+    delete_query = db.query(DashboardRollupDB)
+    if user_id is not None:
+        delete_query = delete_query.filter(DashboardRollupDB.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+
+    vulnerable = func.sum(case((TestResultDB.vulnerable == True, 1), else_=0))
+    year = extract("year", TestResultDB.created_at)
+    month = extract("month", TestResultDB.created_at)
+    severity = case(
+        (TestResultDB.confidence >= 0.9, "critical"),
+        (TestResultDB.confidence >= 0.7, "high"),
+        (TestResultDB.confidence >= 0.5, "medium"),
+        (TestResultDB.confidence < 0.5, "low"),
+    )
+
+    def grouped(*columns, vulnerable_only: bool = False):
+        query = db.query(TestResultDB.user_id, *columns, func.count(TestResultDB.id), vulnerable)
+        if user_id is not None:
+            query = query.filter(TestResultDB.user_id == user_id)
+        if vulnerable_only:
+            query = query.filter(and_(TestResultDB.vulnerable == True, TestResultDB.confidence != None))
+        return query.group_by(TestResultDB.user_id, *columns).all()
+
+    counters = []
+    for row_user, total, vulnerable_count in grouped():
+        counters.append((row_user, "total", TOTAL_KEY, total, vulnerable_count))
+    for row_user, key, total, vulnerable_count in grouped(TestResultDB.test_name):
+        counters.append((row_user, "test_name", key, total, vulnerable_count))
+    for row_user, key, total, vulnerable_count in grouped(TestResultDB.api_type):
+        counters.append((row_user, "api_type", key, total, vulnerable_count))
+    for row_user, row_year, row_month, total, vulnerable_count in grouped(year, month):
+        counters.append((row_user, "month", f"{int(row_year):04d}-{int(row_month):02d}", total, vulnerable_count))
+    for row_user, key, total, vulnerable_count in grouped(severity, vulnerable_only=True):
+        counters.append((row_user, "severity", key, total, vulnerable_count))
+
+    totals: Dict[Tuple[int, str, str], List[int]] = {
+        (row_user, dimension, key): [total, int(vulnerable_count or 0)]
+        for row_user, dimension, key, total, vulnerable_count in counters
+    }
+    # Archived results have left test_results but still count
+    for archived_user in ([user_id] if user_id is not None else archived_user_ids()):
+        for counter, (total, vulnerable_count) in rollup_increments(iter_archived_rows(archived_user)).items():
+            counts = totals.setdefault(counter, [0, 0])
+            counts[0] += total
+            counts[1] += vulnerable_count
+
+    db.bulk_insert_mappings(DashboardRollupDB, [
+        {"user_id": row_user, "dimension": dimension, "key": key, "total": total, "vulnerable": vulnerable_count}
+        for (row_user, dimension, key), (total, vulnerable_count) in totals.items()
+    ])
+    db.flush()
+
+def dashboard_from_rollups(db: Session, user_id: int) -> dict:
+    """Dashboard payload built from the user's counters"""
+    rows = db.query(
+        DashboardRollupDB.dimension, DashboardRollupDB.key, DashboardRollupDB.total, DashboardRollupDB.vulnerable
+    ).filter(DashboardRollupDB.user_id == user_id).all()
+
+    by_dimension: Dict[str, Dict[str, Tuple[int, int]]] = defaultdict(dict)
+    for dimension, key, total, vulnerable in rows:
+        by_dimension[dimension][key] = (total, vulnerable)
+
+    total_tests, vulnerabilities = by_dimension["total"].get(TOTAL_KEY, (0, 0))
+    severities = by_dimension["severity"]
+    return {
+        "stats": {
+            "total_tests": total_tests,
+            "vulnerabilities": vulnerabilities,
+            "tests": total_tests,
+            "workflows": 1  # Placeholder, you can implement logic for workflows
+        },
+        "risk_levels": {
+            level: severities.get(level, (0, 0))[1]
+            for level in ("critical", "high", "medium", "low")
+        },
+        "categories": {
+            key: vulnerable for key, (_, vulnerable) in by_dimension["test_name"].items() if vulnerable
+        },
+        "api_types": {key: total for key, (total, _) in by_dimension["api_type"].items()},
+        "timeline": {
+            key: by_dimension["month"][key][1] for key in sorted(by_dimension["month"])
+        }
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the dashboard rollup table")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", type=int, default=None, help="Only rebuild this user's counters")
+    args = parser.parse_args()
+
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db, args.user)
+        db.commit()
+        print(f"Rebuilt dashboard rollups for {'user ' + str(args.user) if args.user is not None else 'all users'}")
+    finally:
+        db.close()
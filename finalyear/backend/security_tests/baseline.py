@@ -0,0 +1,119 @@
+# backend/security_tests/baseline.py
+import asyncio
+import hashlib
+import json
+import os
+import statistics
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from models import APITestRequest
+from utils.api_client import make_api_request
+
+# Seconds a baseline may be reused by later scans; 0 keeps baselines for a single scan
+BASELINE_TTL = float(os.getenv("SCANNER_BASELINE_TTL", "0"))
+# Baseline requests sent to build the latency distribution
+BASELINE_SAMPLES = int(os.getenv("SCANNER_BASELINE_SAMPLES", "3"))
+
+def request_fingerprint(test_request: APITestRequest) -> str:
+    """Stable hash of everything that determines the baseline response"""
+    key = json.dumps([
+        test_request.method.upper(),
+        test_request.url,
+        sorted(test_request.params.items()),
+        sorted((name.lower(), value) for name, value in test_request.headers.items()),
+        test_request.body,
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+class Baseline:
+    """Unmodified response to a request plus the latencies observed while fetching it"""
+
+    def __init__(self, status: int, text: str, headers: Dict[str, str]):
+        self.status = status
+        self.text = text
+        self.headers = headers
+        self.latencies: List[float] = []
+        self.fetched_at = time.monotonic()
+        # Response dict in the shape the detectors compare against; the diff
+        # engine caches its fingerprint here so it is only computed once
+        self.response = {"status": status, "text": text, "headers": headers}
+
+    @property
+    def median_latency(self) -> float:
+        return statistics.median(self.latencies)
+
+    @property
+    def mean_latency(self) -> float:
+        return statistics.fmean(self.latencies)
+
+    @property
+    def latency_stdev(self) -> float:
+        return statistics.stdev(self.latencies) if len(self.latencies) > 1 else 0.0
+
+    def add_latencies(self, latencies: List[float]):
+        self.latencies.extend(latencies)
+
+class BaselineCache:
+    """Baselines keyed by request fingerprint, shared by every test module in a scan"""
+
+    def __init__(self, ttl: float = 0):
+        self.ttl = ttl
+        self._entries: Dict[str, Baseline] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _fresh(self, baseline: Baseline) -> bool:
+        return not self.ttl or time.monotonic() - baseline.fetched_at < self.ttl
+
+    def _prune(self):
+        for key in [key for key, baseline in self._entries.items() if not self._fresh(baseline)]:
+            del self._entries[key]
+            if not self._locks[key].locked():
+                del self._locks[key]
+
+    async def get(self, test_request: APITestRequest, samples: int = BASELINE_SAMPLES) -> Baseline:
+        """Return the baseline for a request, fetching it (once) if needed"""
+        key = request_fingerprint(test_request)
+        if self.ttl:
+            self._prune()
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            baseline = self._entries.get(key)
+            if baseline is None or not self._fresh(baseline):
+                baseline = None
+            missing = max(samples, 1) - (len(baseline.latencies) if baseline else 0)
+            latencies = []
+            # Samples run one after another so they do not skew each other's latency
+            for _ in range(max(0, missing)):
+                response = await make_api_request(
+                    method=test_request.method,
+                    url=test_request.url,
+                    headers=test_request.headers,
+                    params=test_request.params,
+                    body=test_request.body
+                )
+                # Round trip only: throttle waits are not the target's latency
+                latencies.append(response.elapsed.total_seconds())
+                if baseline is None:
+                    baseline = Baseline(response.status_code, response.text, dict(response.headers))
+                    self._entries[key] = baseline
+            baseline.add_latencies(latencies)
+            return baseline
+
+# Process-wide cache used when baselines may be reused across scans
+shared_baselines = BaselineCache(ttl=BASELINE_TTL)
+
+# Cache of the scan currently running (set by APISecurityScanner.run_tests)
+current_baselines: ContextVar[Optional[BaselineCache]] = ContextVar("current_baselines", default=None)
+
+def new_scan_baselines() -> BaselineCache:
+    """Cache for a new scan: the shared one when a TTL is configured, else a fresh one"""
+    return shared_baselines if BASELINE_TTL else BaselineCache()
+
+async def get_baseline(test_request: APITestRequest, samples: int = BASELINE_SAMPLES) -> Baseline:
+    """Baseline for the request from the current scan's cache"""
+    cache = current_baselines.get()
+    if cache is None:
+        cache = new_scan_baselines()
+        current_baselines.set(cache)
+    return await cache.get(test_request, samples)
@@ -0,0 +1,152 @@
+# backend/security_tests/batch.py
+import asyncio
+import os
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+from models import APITestRequest, BatchTestRequest, BatchTargetResult, TestResult
+from .scanner import APISecurityScanner, scan_trace_for
+
+# Number of targets scanned at the same time in one batch
+BATCH_WORKERS = int(os.getenv("SCANNER_BATCH_WORKERS", "10"))
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+def targets_from_openapi(
+    spec: Dict[str, Any],
+    base_url: Optional[str] = None,
+    headers: Dict[str, str] = None,
+    tests: List[str] = None
+) -> List[APITestRequest]:
+    """Build one REST target per operation in an OpenAPI document"""
+    if not base_url:
+        servers = spec.get("servers") or [{}]
+        base_url = servers[0].get("url", "")
+    targets = []
+    for path, operations in (spec.get("paths") or {}).items():
+        shared_params = operations.get("parameters", [])
+        for method, operation in operations.items():
+            if method not in HTTP_METHODS:
+                continue
+            params = {}
+            for param in shared_params + operation.get("parameters", []):
+                # Fill parameters with a harmless placeholder value
+                if param.get("in") == "path":
+                    path = path.replace("{" + param["name"] + "}", "1")
+                elif param.get("in") == "query":
+                    params[param["name"]] = "1"
+            targets.append(APITestRequest(
+                api_type="REST",
+                url=urljoin(base_url.rstrip("/") + "/", path.lstrip("/")),
+                method=method.upper(),
+                headers=headers or {},
+                params=params,
+                tests=tests or APITestRequest.model_fields["tests"].default
+            ))
+    return targets
+
+def targets_from_wsdl(
+    wsdl: str,
+    base_url: Optional[str] = None,
+    headers: Dict[str, str] = None,
+    tests: List[str] = None
+) -> List[APITestRequest]:
+    """Build one SOAP target per operation bound to each service address in a WSDL document"""
+    root = ET.fromstring(wsdl)
+    locations = [
+        el.get("location") for el in root.iter()
+        if el.tag.endswith("}address") and el.get("location")
+    ]
+    if base_url:
+        locations = [base_url]
+    operations = list(OrderedDict.fromkeys(
+        el.get("name") for el in root.iter()
+        if el.tag.endswith("}operation") and el.get("name")
+    ))
+    targets = []
+    for location in OrderedDict.fromkeys(locations):
+        for operation in operations:
+            targets.append(APITestRequest(
+                api_type="SOAP",
+                url=location,
+                method="POST",
+                headers=headers or {"Content-Type": "text/xml"},
+                body=(
+                    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+                    f"<soap:Body><{operation}></{operation}></soap:Body></soap:Envelope>"
+                ),
+                tests=tests or APITestRequest.model_fields["tests"].default
+            ))
+    return targets
+
+def expand_batch(batch: BatchTestRequest) -> List[APITestRequest]:
+    """All targets of a batch: the explicit list plus anything derived from the specs"""
+    targets = list(batch.targets)
+    if batch.openapi_spec:
+        targets += targets_from_openapi(batch.openapi_spec, batch.base_url, batch.headers, batch.tests)
+    if batch.wsdl:
+        targets += targets_from_wsdl(batch.wsdl, batch.base_url, batch.headers, batch.tests)
+    if batch.trace:
+        targets = [target.model_copy(update={"trace": True}) for target in targets]
+    return targets
+
+def interleave_by_host(targets: List[APITestRequest]) -> List[int]:
+    """Order target indexes round-robin across hosts so no single host monopolises the workers"""
+    by_host: Dict[str, deque] = OrderedDict()
+    for index, target in enumerate(targets):
+        by_host.setdefault(urlsplit(target.url).netloc.lower(), deque()).append(index)
+    order = []
+    while by_host:
+        for host in list(by_host):
+            order.append(by_host[host].popleft())
+            if not by_host[host]:
+                del by_host[host]
+    return order
+
+class BatchScanner:
+    def __init__(self, workers: int = BATCH_WORKERS, scanner: Optional[APISecurityScanner] = None):
+        self.workers = workers
+        self.scanner = scanner or APISecurityScanner()
+
+    async def run(
+        self,
+        targets: List[APITestRequest],
+        on_target_done: Optional[Callable[[BatchTargetResult], Awaitable[None]]] = None,
+        on_result: Optional[Callable[[APITestRequest, TestResult], Awaitable[None]]] = None
+    ) -> List[BatchTargetResult]:
+        """
+        Scan every target with a pool of workers; results keep the order of targets.
+        on_result is awaited for each test result and on_target_done for each finished target.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for index in interleave_by_host(targets):
+            queue.put_nowait(index)
+        results: List[Optional[BatchTargetResult]] = [None] * len(targets)
+
+        async def worker():
+            while True:
+                try:
+                    index = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                target = targets[index]
+
+                async def report(result: TestResult, target: APITestRequest = target):
+                    await on_result(target, result)
+
+                trace = scan_trace_for(target)
+                target_result = BatchTargetResult(
+                    api_type=target.api_type,
+                    url=target.url,
+                    method=target.method,
+                    results=await self.scanner.run_tests(target, on_result=report if on_result else None, trace=trace),
+                    trace_id=trace.id if trace else None
+                )
+                if trace:
+                    target_result._trace = trace.to_chrome()
+                results[index] = target_result
+                if on_target_done:
+                    await on_target_done(target_result)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(targets)))))
+        return results
@@ -1,5 +1,6 @@
 # backend/security_tests/custom_payloads.py
-from typing import List, Dict
+from typing import Iterable, Iterator, Optional
+from .payload_corpus import payload_corpus
 
 # SQL Injection payloads
 SQL_INJECTION_PAYLOADS = [
@@ -7,9 +8,7 @@ SQL_INJECTION_PAYLOADS = [
     "' OR 1=1; --",
     "' UNION SELECT null, table_name FROM information_schema.tables --",
     "1; DROP TABLE users --",
-    "1' WAITFOR DELAY '0:0:10' --",  # Time-based SQLi
-    "1 AND (SELECT * FROM (SELECT(SLEEP(5)))",  # MySQL time-based
-]
+]  # Time-based payloads are in sql_injection.TIME_BASED_PAYLOADS
 
 # XSS payloads
 XSS_PAYLOADS = [
@@ -55,13 +54,28 @@ GRAPHQL_PAYLOADS = {
     """
 }
 
-def get_payloads(test_type: str, api_type: str) -> List[str]:
+def get_payloads(
+    test_type: str,
+    api_type: str,
+    tags: Optional[Iterable[str]] = None,
+    mutations: Optional[Iterable[str]] = None,
+    limit: Optional[int] = None,
+    exclude_tags: Iterable[str] = ()
+) -> Iterator[str]:
+    """
+    Payloads for a test, read lazily from the corpus in security_tests/payloads/
+    (see payload_corpus.py); the built-in lists below are used for test types
+    without a corpus. tags, mutations and limit default to the SCANNER_PAYLOAD_*
+    settings; payloads with any of exclude_tags are skipped.
+    """
     if test_type == "sql":
-        return SQL_INJECTION_PAYLOADS
+        fallback = SQL_INJECTION_PAYLOADS
     elif test_type == "xss":
-        return XSS_PAYLOADS
+        fallback = XSS_PAYLOADS
     elif test_type == "ssrf":
-        return SSRF_PAYLOADS
-    elif api_type == "GraphQL":
-        return GRAPHQL_PAYLOADS.get(test_type, [])
-    return []
\ No newline at end of file
+        fallback = SSRF_PAYLOADS
+    elif api_type == "GraphQL" and test_type in GRAPHQL_PAYLOADS:
+        fallback = [GRAPHQL_PAYLOADS[test_type]]
+    else:
+        fallback = []
+    return payload_corpus.payloads(test_type, fallback, tags=tags, mutations=mutations, limit=limit, exclude_tags=exclude_tags)
@@ -0,0 +1,82 @@
+# backend/security_tests/fanout.py
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from utils.tracing import current_span, span
+
+# How many payload probes a single test keeps in flight
+PAYLOAD_CONCURRENCY = int(os.getenv("SCANNER_PAYLOAD_CONCURRENCY", "5"))
+
+async def first_match(
+    payloads: Iterable[Any],
+    probe: Callable[[Any], Awaitable[Optional[Any]]],
+    concurrency: int = PAYLOAD_CONCURRENCY
+) -> Optional[Any]:
+    """
+    Run probe(payload) for each payload concurrently and return the outcome of the
+    earliest payload (in payload order) whose probe returned a result or raised.
+
+    This gives the same answer as awaiting the probes one by one and stopping at the
+    first hit: once a payload is decisive, probes for later payloads are cancelled and
+    only the earlier ones still in flight are awaited. Returns None if no probe hits;
+    an exception from the decisive probe is re-raised.
+    """
+    if current_span.get() is not None:
+        untraced_probe = probe
+
+        async def probe(payload: Any) -> Optional[Any]:
+            with span("payload", "payload", payload=str(payload)[:200]):
+                return await untraced_probe(payload)
+
+    payload_iter = iter(payloads)
+    pending: Dict[asyncio.Task, int] = {}
+    outcomes: Dict[int, Tuple[Optional[Any], Optional[BaseException]]] = {}
+    decisive: Optional[int] = None
+    next_index = 0
+    exhausted = False
+
+    try:
+        while True:
+            # Keep the window full until a decisive payload is known
+            while decisive is None and not exhausted and len(pending) < concurrency:
+                try:
+                    payload = next(payload_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(probe(payload))] = next_index
+                next_index += 1
+
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = pending.pop(task)
+                error = task.exception()
+                result = None if error else task.result()
+                if error is not None or result is not None:
+                    outcomes[index] = (result, error)
+                    if decisive is None or index < decisive:
+                        decisive = index
+
+            if decisive is not None:
+                # Later payloads can no longer change the answer
+                cancelled = [task for task, index in pending.items() if index > decisive]
+                for task in cancelled:
+                    task.cancel()
+                    del pending[task]
+                if cancelled:
+                    await asyncio.gather(*cancelled, return_exceptions=True)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    if decisive is None:
+        return None
+    result, error = outcomes[decisive]
+    if error is not None:
+        raise error
+    return result
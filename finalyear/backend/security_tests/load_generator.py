@@ -0,0 +1,175 @@
+# backend/security_tests/load_generator.py
+import asyncio
+import math
+import time
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+import httpx
+from models import RateLimitConfig
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram: values are bucketed with a fixed number of
+    significant digits, so memory stays small and percentiles keep a bounded
+    relative error however many samples are recorded.
+    """
+
+    def __init__(self, significant_digits: int = 2):
+        self.significant_digits = significant_digits
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _bucket(self, value: float) -> float:
+        if value <= 0:
+            return 0.0
+        exponent = math.floor(math.log10(value)) - self.significant_digits + 1
+        return round(value / 10 ** exponent) * 10 ** exponent
+
+    def record(self, value: float):
+        self.buckets[self._bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for value in sorted(self.buckets):
+            seen += self.buckets[value]
+            if seen >= rank:
+                return value
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "min": self.min if self.count else 0.0,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+class LoadReport:
+    """What happened during a load run"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.sent = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        # Status code counts per whole second since the start of the run
+        self.status_timeline: Dict[int, Counter] = defaultdict(Counter)
+        self.start_times: List[float] = []
+        # Where rate limiting started: request sequence number, seconds into the run and rate
+        self.limited_at_request: Optional[int] = None
+        self.limited_at_time: Optional[float] = None
+        self.limited_at_rps: Optional[float] = None
+        self.retry_after: Optional[str] = None
+
+    @property
+    def rate_limited(self) -> bool:
+        return self.limited_at_request is not None
+
+    @property
+    def achieved_rps(self) -> float:
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def rate_before(self, offset: float, window: float = 1.0) -> float:
+        """Requests per second sent in the window before offset"""
+        return sum(1 for start in self.start_times if offset - window <= start <= offset) / window
+
+    def status_counts(self) -> Counter:
+        total: Counter = Counter()
+        for counts in self.status_timeline.values():
+            total.update(counts)
+        return total
+
+class LoadGenerator:
+    """Sends requests at a ramped arrival rate (open model) or from N clients (closed model)"""
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+
+    def _rate_at(self, offset: float) -> float:
+        progress = min(1.0, offset / self.config.duration) if self.config.duration else 1.0
+        return self.config.start_rps + (self.config.end_rps - self.config.start_rps) * progress
+
+    async def run(self, send: Callable[[], Awaitable[httpx.Response]]) -> LoadReport:
+        report = LoadReport()
+        stop = asyncio.Event()
+        slots = asyncio.Semaphore(self.config.concurrency)
+        started = time.perf_counter()
+
+        async def fire(sequence: int):
+            offset = time.perf_counter() - started
+            report.start_times.append(offset)
+            try:
+                response = await send()
+            except Exception:
+                report.errors += 1
+                report.status_timeline[int(offset)]["error"] += 1
+                return
+            finally:
+                report.latency.record(time.perf_counter() - started - offset)
+            report.status_timeline[int(offset)][response.status_code] += 1
+            limited = response.status_code == 429 or "retry-after" in response.headers
+            if limited and (report.limited_at_request is None or sequence < report.limited_at_request):
+                report.limited_at_request = sequence
+                report.limited_at_time = offset
+                report.limited_at_rps = report.rate_before(offset)
+                report.retry_after = response.headers.get("retry-after")
+                if self.config.stop_on_limit:
+                    stop.set()
+
+        def should_continue() -> bool:
+            return (
+                not stop.is_set()
+                and report.sent < self.config.max_requests
+                and time.perf_counter() - started < self.config.duration
+            )
+
+        if self.config.model == "closed":
+            async def client():
+                while should_continue():
+                    report.sent += 1
+                    await fire(report.sent)
+
+            await asyncio.gather(*(client() for _ in range(self.config.concurrency)))
+        else:
+            tasks = []
+
+            async def bounded(sequence: int):
+                try:
+                    await fire(sequence)
+                finally:
+                    slots.release()
+
+            next_arrival = 0.0
+            while should_continue():
+                delay = next_arrival - (time.perf_counter() - started)
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=delay)
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+                await slots.acquire()
+                report.sent += 1
+                tasks.append(asyncio.create_task(bounded(report.sent)))
+                next_arrival += 1 / max(self._rate_at(next_arrival), 0.001)
+            await asyncio.gather(*tasks)
+
+        report.elapsed = time.perf_counter() - started
+        return report
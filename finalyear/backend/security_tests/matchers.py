@@ -0,0 +1,95 @@
+# backend/security_tests/matchers.py
+import re
+from typing import Dict, List, Optional
+from utils.tracing import detector
+
+# SQL error patterns for various databases
+SQL_ERROR_PATTERNS = [
+    r"SQL.*error",
+    r"ORA-[0-9]{5}",
+    r"MySQL.*error",
+    r"Syntax error",
+    r"unclosed quotation mark",
+    r"quoted string not properly terminated",
+    r"SQLiteException",
+    r"PostgreSQL.*ERROR",
+    r"Microsoft SQL Server",
+    r"ODBC Driver",
+    r"JDBC Driver",
+    r"PdoException",
+    r"SQL syntax",
+    r"Warning.*mysql",
+    r"Unclosed quotation mark",
+    r"Database error",
+    r"SQLSTATE\[",
+    r"Driver.*error",
+    r"SQL command not properly ended",
+    r"invalid SQL statement",
+]
+
+# Sensitive data patterns that might indicate information leakage
+SENSITIVE_DATA_PATTERNS = [
+    r"password",
+    r"credit_card",
+    r"ssn",
+    r"secret",
+    r"token",
+    r"private",
+    r"auth",
+    r"session",
+]
+
+class SignatureMatcher:
+    """
+    Matches groups of regex signatures against a response, one pass per category.
+
+    The patterns of each category are compiled once into one alternation with a
+    named group per pattern. Categories get separate regexes so a greedy pattern
+    in one (e.g. "SQL.*error") cannot swallow the text another category matches.
+    """
+
+    def __init__(self, signatures: Dict[str, List[str]], flags: int = re.IGNORECASE):
+        self._signatures: Dict[str, str] = {}
+        self._regexes: Dict[str, re.Pattern] = {}
+        for category, patterns in signatures.items():
+            alternatives = []
+            for index, pattern in enumerate(patterns):
+                group = f"{category}_{index}"
+                self._signatures[group] = pattern
+                alternatives.append(f"(?P<{group}>{pattern})")
+            self._regexes[category] = re.compile("|".join(alternatives), flags)
+        self.categories = set(signatures)
+
+    @detector("signatures.first")
+    def first(self, text: str, category: str) -> Optional[str]:
+        """Return the first signature of the category found in text, or None"""
+        match = self._regexes[category].search(text)
+        return self._signatures[match.lastgroup] if match else None
+
+    @detector("signatures.scan")
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Return every matched signature in text, grouped by category"""
+        found: Dict[str, List[str]] = {}
+        for category, regex in self._regexes.items():
+            matched: List[str] = []
+            for match in regex.finditer(text):
+                pattern = self._signatures[match.lastgroup]
+                if pattern not in matched:
+                    matched.append(pattern)
+            if matched:
+                found[category] = matched
+        return found
+
+# Shared matcher for SQL errors and data leakage, used by the REST, SOAP and GraphQL tests
+RESPONSE_SIGNATURES = SignatureMatcher({
+    "sql_error": SQL_ERROR_PATTERNS,
+    "sensitive_data": SENSITIVE_DATA_PATTERNS,
+})
+
+def contains_sql_error(response_text: str) -> bool:
+    """Check if response contains SQL error patterns"""
+    return RESPONSE_SIGNATURES.first(response_text, "sql_error") is not None
+
+def contains_sensitive_data(response_text: str) -> bool:
+    """Check if response contains sensitive data patterns"""
+    return RESPONSE_SIGNATURES.first(response_text, "sensitive_data") is not None
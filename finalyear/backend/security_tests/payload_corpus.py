@@ -0,0 +1,170 @@
+# backend/security_tests/payload_corpus.py
+import hashlib
+import mmap
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import quote
+
+# Directories holding <test_type>/*.txt corpora, separated by os.pathsep (later ones add to earlier ones)
+PAYLOAD_DIRS = os.getenv("SCANNER_PAYLOAD_DIRS", os.path.join(os.path.dirname(__file__), "payloads"))
+# Only use payloads with one of these tags (empty = all); "generic" payloads always match
+PAYLOAD_TAGS = os.getenv("SCANNER_PAYLOAD_TAGS", "")
+# Encoded variants generated from each payload, e.g. "url,case" (empty = payloads as written)
+PAYLOAD_MUTATIONS = os.getenv("SCANNER_PAYLOAD_MUTATIONS", "")
+# Most payloads (variants included) a test sends; 0 = no limit
+MAX_PAYLOADS = int(os.getenv("SCANNER_MAX_PAYLOADS", "200"))
+
+GENERIC_TAG = "generic"
+# Fixed-duration sleeps: too slow to fan out with the other payloads of a test
+TIME_TAG = "time"
+TAG_DIRECTIVE = b"#tags:"
+
+def split_list(value: str) -> List[str]:
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+def url_encode(payload: str) -> str:
+    return quote(payload, safe="")
+
+def double_url_encode(payload: str) -> str:
+    return quote(quote(payload, safe=""), safe="")
+
+def unicode_encode(payload: str) -> str:
+    """IIS-style %uXXXX escapes for everything but letters and digits"""
+    return "".join(char if char.isalnum() and char.isascii() else f"%u{ord(char):04X}" for char in payload)
+
+def alternate_case(payload: str) -> str:
+    """SeLeCt-style case for keyword filters that only match one case"""
+    result = []
+    upper = True
+    for char in payload:
+        if char.isalpha():
+            result.append(char.upper() if upper else char.lower())
+            upper = not upper
+        else:
+            result.append(char)
+    return "".join(result)
+
+MUTATIONS: Dict[str, Callable[[str], str]] = {
+    "url": url_encode,
+    "double_url": double_url_encode,
+    "unicode": unicode_encode,
+    "case": alternate_case
+}
+
+class CorpusFile:
+    """
+    One SecLists-style corpus file: a payload per line, read lazily through mmap.
+
+    Blank lines and lines starting with "#" are skipped (write "\\#" for a payload
+    that starts with "#"). The file name (without .txt) tags every payload in
+    it, and a "#tags: a, b" line adds tags to the payloads that follow it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0].lower()
+
+    def entries(self) -> Iterator[Tuple[str, Set[str]]]:
+        with open(self.path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                tags = {self.name}
+                for raw in iter(data.readline, b""):
+                    line = raw.rstrip(b"\r\n")
+                    if not line.strip():
+                        continue
+                    if line.startswith(b"#"):
+                        if line.replace(b" ", b"").lower().startswith(TAG_DIRECTIVE):
+                            tags = {self.name, *split_list(line.split(b":", 1)[1].decode("utf-8", "replace"))}
+                        continue
+                    if line.startswith(b"\\#"):
+                        line = line[1:]
+                    yield line.decode("utf-8", "replace"), tags
+
+class PayloadCorpus:
+    """
+    Payloads for each test type from on-disk corpora.
+
+    Files are found under <dir>/<test_type>/*.txt for every corpus directory;
+    generic.txt comes first, then the rest by name. Nothing is read until the
+    payloads are iterated, and then only one line at a time, so large corpora
+    cost no memory up front. Variants from mutations are deduplicated by a
+    short digest, so overlapping corpora and encodings are sent once.
+    """
+
+    def __init__(self, directories: Sequence[str]):
+        self.directories = [directory for directory in directories if directory]
+        self._files: Dict[str, List[CorpusFile]] = {}
+
+    def files(self, test_type: str) -> List[CorpusFile]:
+        files = self._files.get(test_type)
+        if files is None:
+            files = []
+            for directory in self.directories:
+                folder = os.path.join(directory, test_type)
+                if not os.path.isdir(folder):
+                    continue
+                names = sorted(name for name in os.listdir(folder) if name.endswith(".txt"))
+                names.sort(key=lambda name: name != f"{GENERIC_TAG}.txt")
+                files.extend(CorpusFile(os.path.join(folder, name)) for name in names)
+            self._files[test_type] = files
+        return files
+
+    def has_corpus(self, test_type: str) -> bool:
+        return bool(self.files(test_type))
+
+    def payloads(
+        self,
+        test_type: str,
+        fallback: Iterable[str] = (),
+        tags: Optional[Iterable[str]] = None,
+        mutations: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        exclude_tags: Iterable[str] = ()
+    ) -> Iterator[str]:
+        """
+        Payloads for test_type, each followed by its mutated variants, without
+        duplicates. fallback is used when there is no corpus for test_type.
+        Payloads with any of exclude_tags are skipped, generic ones included.
+        """
+        wanted = set(split_list(PAYLOAD_TAGS) if tags is None else tags)
+        names = split_list(PAYLOAD_MUTATIONS) if mutations is None else list(mutations)
+        unknown = [name for name in names if name not in MUTATIONS]
+        if unknown:
+            raise ValueError(f"Unknown payload mutations: {', '.join(unknown)} (use {', '.join(MUTATIONS)})")
+        files = self.files(test_type)
+        if files:
+            entries = (entry for corpus_file in files for entry in corpus_file.entries())
+        else:
+            entries = ((payload, {GENERIC_TAG}) for payload in fallback)
+        return self._expand(
+            entries, wanted, set(exclude_tags), [MUTATIONS[name] for name in names], MAX_PAYLOADS if limit is None else limit
+        )
+
+    def _expand(
+        self,
+        entries: Iterable[Tuple[str, Set[str]]],
+        wanted: Set[str],
+        excluded: Set[str],
+        mutators: List[Callable[[str], str]],
+        limit: int
+    ) -> Iterator[str]:
+        seen: Set[bytes] = set()
+        count = 0
+        for payload, payload_tags in entries:
+            if wanted and GENERIC_TAG not in payload_tags and not wanted & payload_tags:
+                continue
+            if excluded & payload_tags:
+                continue
+            for variant in (payload, *(mutate(payload) for mutate in mutators)):
+                digest = hashlib.blake2b(variant.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                yield variant
+                count += 1
+                if limit and count >= limit:
+                    return
+
+payload_corpus = PayloadCorpus(PAYLOAD_DIRS.split(os.pathsep))
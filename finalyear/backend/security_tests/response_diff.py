@@ -0,0 +1,150 @@
+# backend/security_tests/response_diff.py
+import asyncio
+import contextvars
+import heapq
+import json
+import os
+import re
+from difflib import SequenceMatcher
+from typing import Any, FrozenSet, List, Optional
+from utils.tracing import detector
+
+# Bodies up to this size are compared with an exact SequenceMatcher ratio
+EXACT_DIFF_MAX_CHARS = int(os.getenv("SCANNER_EXACT_DIFF_MAX_CHARS", "20000"))
+# Bodies above this size are fingerprinted off the event loop
+OFFLOAD_MIN_CHARS = int(os.getenv("SCANNER_DIFF_OFFLOAD_MIN_CHARS", "20000"))
+# Array elements inspected when collecting JSON key paths
+JSON_SAMPLE_ITEMS = 50
+# Number of shingle hashes kept in a bottom-k MinHash sketch
+MINHASH_SIZE = 128
+
+TOKEN_RE = re.compile(r"\w+")
+
+def json_key_paths(value: Any, prefix: str = "") -> FrozenSet[str]:
+    """Collect the structural key paths of a JSON document (lists become "[]")"""
+    paths = set()
+    if isinstance(value, dict):
+        for key, item in value.items():
+            path = f"{prefix}.{key}"
+            paths.add(path)
+            paths |= json_key_paths(item, path)
+    elif isinstance(value, list):
+        path = f"{prefix}[]"
+        paths.add(path)
+        for item in value[:JSON_SAMPLE_ITEMS]:
+            paths |= json_key_paths(item, path)
+    return frozenset(paths)
+
+def minhash_sketch(text: str, shingle_size: int = 3, size: int = MINHASH_SIZE) -> List[int]:
+    """Bottom-k MinHash sketch of the word shingles of a body (one hash per shingle)"""
+    tokens = TOKEN_RE.findall(text)
+    shingles = {
+        hash(tuple(tokens[i:i + shingle_size]))
+        for i in range(max(1, len(tokens) - shingle_size + 1))
+    }
+    return heapq.nsmallest(size, shingles)
+
+def minhash_similarity(a: List[int], b: List[int], size: int = MINHASH_SIZE) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two sketches"""
+    union = heapq.nsmallest(size, set(a) | set(b))
+    if not union:
+        return 1.0
+    both = set(a) & set(b)
+    return sum(1 for value in union if value in both) / len(union)
+
+class ResponseFingerprint:
+    """Cheap summary of a response used to compare it against other responses"""
+
+    def __init__(self, status: int, text: str, with_sketch: bool = True):
+        self.status = status
+        self.length = len(text)
+        self.key_paths: Optional[FrozenSet[str]] = None
+        self.array_length: Optional[int] = None
+        try:
+            document = json.loads(text)
+            self.key_paths = json_key_paths(document)
+            if isinstance(document, list):
+                self.array_length = len(document)
+        except ValueError:
+            pass
+        # Small bodies are compared exactly, so they can skip the sketch
+        self.sketch = minhash_sketch(text) if with_sketch else None
+
+class DiffEngine:
+    """
+    Decides whether two responses differ significantly.
+
+    Status code, length and JSON structure are compared first. Content similarity
+    uses an exact SequenceMatcher ratio for small bodies and a MinHash estimate of
+    shingle overlap for large ones, so cost stays linear in the body size.
+    Subclass and override similarity() to plug in another content comparison.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.3,
+        min_similarity: float = 0.7,
+        exact_max_chars: int = EXACT_DIFF_MAX_CHARS,
+        offload_min_chars: int = OFFLOAD_MIN_CHARS
+    ):
+        self.threshold = threshold
+        self.min_similarity = min_similarity
+        self.exact_max_chars = exact_max_chars
+        self.offload_min_chars = offload_min_chars
+
+    def fingerprint(self, response: dict) -> ResponseFingerprint:
+        """Fingerprint of a response dict, cached on the dict for reuse against many payloads"""
+        fingerprint = response.get("fingerprint")
+        if fingerprint is None:
+            fingerprint = ResponseFingerprint(
+                response["status"],
+                response["text"],
+                with_sketch=len(response["text"]) > self.exact_max_chars
+            )
+            response["fingerprint"] = fingerprint
+        return fingerprint
+
+    def similarity(self, baseline: dict, current: dict) -> float:
+        if max(len(baseline["text"]), len(current["text"])) <= self.exact_max_chars:
+            return SequenceMatcher(None, baseline["text"], current["text"]).ratio()
+        return minhash_similarity(
+            self.fingerprint(baseline).sketch or minhash_sketch(baseline["text"]),
+            self.fingerprint(current).sketch or minhash_sketch(current["text"])
+        )
+
+    @detector("response_diff.differs")
+    def differs(self, baseline: dict, current: dict) -> bool:
+        # Compare status codes
+        if baseline["status"] != current["status"]:
+            return True
+
+        # Compare response length (more than 30% difference)
+        length_diff = abs(len(baseline["text"]) - len(current["text"]))
+        if length_diff > (len(baseline["text"]) * self.threshold):
+            return True
+
+        # For JSON responses (objects or arrays), compare structure
+        base_print = self.fingerprint(baseline)
+        current_print = self.fingerprint(current)
+        if base_print.key_paths is not None and current_print.key_paths is not None:
+            if base_print.key_paths != current_print.key_paths:
+                return True
+            if base_print.array_length is not None and current_print.array_length is not None:
+                if abs(base_print.array_length - current_print.array_length) > 3:
+                    return True
+
+        # Compare content similarity
+        return self.similarity(baseline, current) < self.min_similarity
+
+    async def differs_async(self, baseline: dict, current: dict) -> bool:
+        """Same as differs(), but large bodies are compared in a worker thread"""
+        if baseline["status"] != current["status"]:
+            return True
+        if max(len(baseline["text"]), len(current["text"])) < self.offload_min_chars:
+            return self.differs(baseline, current)
+        # Copy the context so a traced scan still records the comparison
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, context.run, self.differs, baseline, current)
+
+# Engine used by the SQL injection tests
+DIFF_ENGINE = DiffEngine()
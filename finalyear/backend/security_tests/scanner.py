@@ -1,6 +1,16 @@
 # backend/security_tests/scanner.py
-from typing import List
+import asyncio
+import logging
+import os
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
 from models import APITestRequest, TestResult
+from utils.metrics import SCANS_IN_PROGRESS, TEST_BYTES, TEST_DURATION, TEST_RESULTS, current_test_bytes
+from utils.tracing import ScanTrace, span, start_trace
+from utils.request_policy import ScanBudgetExceeded, TargetUnreachableError, current_budget, new_scan_budget
+from .baseline import current_baselines, new_scan_baselines
 from .sql_injection import test_sql_injection
 from .xss import test_xss
 from .ssrf import test_ssrf
@@ -8,8 +18,44 @@ from .rate_limiting import test_rate_limiting
 from .soap_tests import test_soap_sql_injection, test_soap_xss, test_soap_ssrf, test_soap_xxe
 from .graphql_tests import test_graphql_introspection, test_graphql_sql_injection, test_graphql_xss, test_graphql_dos
 
+logger = logging.getLogger(__name__)
+
+# How many tests may run at once, overall and against a single target host
+MAX_CONCURRENT_TESTS = int(os.getenv("SCANNER_MAX_CONCURRENT_TESTS", "8"))
+MAX_CONCURRENT_TESTS_PER_HOST = int(os.getenv("SCANNER_MAX_CONCURRENT_TESTS_PER_HOST", "4"))
+
+# Shared across scanner instances so parallel scans respect the same limits: one
+# slot per target host, plus the overall one under GLOBAL_SLOT. Semaphores belong
+# to one event loop, so they are kept per loop: process-pool workers run each
+# scan under its own asyncio.run().
+GLOBAL_SLOT = "*"
+_shared_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+def _shared_slot(key: str, limit: int) -> asyncio.Semaphore:
+    slots = _shared_slots.setdefault(asyncio.get_running_loop(), {})
+    slot = slots.get(key)
+    if slot is None:
+        slot = asyncio.Semaphore(limit)
+        slots[key] = slot
+    return slot
+
+def _host_slot(url: str, limit: int) -> asyncio.Semaphore:
+    return _shared_slot(urlsplit(url).netloc.lower(), limit)
+
+def scan_trace_for(test_request: APITestRequest) -> Optional[ScanTrace]:
+    """A new trace for the scan if the request asked for one"""
+    if not test_request.trace:
+        return None
+    return ScanTrace(f"scan {test_request.url}", api_type=test_request.api_type, url=test_request.url, method=test_request.method)
+
 class APISecurityScanner:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_TESTS,
+        per_host_concurrency: int = MAX_CONCURRENT_TESTS_PER_HOST
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
         self.available_tests = {
             "REST": {
                 "sql": test_sql_injection,
@@ -33,9 +79,17 @@ class APISecurityScanner:
             }
         }
     
-    async def run_tests(self, test_request: APITestRequest) -> List[TestResult]:
-        """Run all configured security tests against the API request"""
-        results = []
+    async def run_tests(
+        self,
+        test_request: APITestRequest,
+        on_result: Optional[Callable[[TestResult], Awaitable[None]]] = None,
+        trace: Optional[ScanTrace] = None
+    ) -> List[TestResult]:
+        """
+        Run all configured security tests against the API request concurrently.
+        on_result, if given, is awaited with each result as soon as its test finishes.
+        trace, if given, records the scan's spans (see utils/tracing.py).
+        """
         api_type = test_request.api_type
         
         if api_type not in self.available_tests:
@@ -48,20 +102,80 @@ class APISecurityScanner:
             )]
         
         tests_to_run = self.available_tests[api_type]
+        selected = [name for name in test_request.tests if name in tests_to_run]
+        
+        global_slot = _shared_slot(GLOBAL_SLOT, self.max_concurrency)
+        host_slot = _host_slot(test_request.url, self.per_host_concurrency)
         
-        for test_name in test_request.tests:
-            if test_name in tests_to_run:
-                test_func = tests_to_run[test_name]
+        async def run_one(test_name: str) -> TestResult:
+            test_func = tests_to_run[test_name]
+            async with global_slot, host_slot:
+                started = time.perf_counter()
+                downloaded = [0]
+                current_test_bytes.set(downloaded)
+                crashed = False
                 try:
-                    result = await test_func(test_request)
-                    results.append(result)
+                    with span(f"test {test_name}", "test", api_type=api_type) as test_span:
+                        result = await test_func(test_request)
+                        if test_span:
+                            test_span.attrs.update(vulnerable=result.vulnerable, status=result.status)
+                except TargetUnreachableError as e:
+                    # Not the same as "not vulnerable": the test never got an answer
+                    result = TestResult(
+                        test_name=test_name,
+                        vulnerable=False,
+                        confidence=0.0,
+                        description=str(e),
+                        recommendation="Check that the target is up and reachable, then rescan",
+                        status="unreachable"
+                    )
+                except ScanBudgetExceeded as e:
+                    result = TestResult(
+                        test_name=test_name,
+                        vulnerable=False,
+                        confidence=0.0,
+                        description=f"Test incomplete: {str(e)}",
+                        recommendation="Rescan with a larger time_budget",
+                        status="timed_out"
+                    )
                 except Exception as e:
-                    results.append(TestResult(
+                    logger.exception("%s test crashed", test_name, extra={"url": test_request.url})
+                    crashed = True
+                    result = TestResult(
                         test_name=test_name,
                         vulnerable=False,
                         confidence=0.0,
                         description=f"Test failed: {str(e)}",
                         recommendation="Check test implementation"
-                    ))
+                    )
+                elapsed = time.perf_counter() - started
+                if crashed:
+                    outcome = "error"
+                elif result.status != "completed":
+                    outcome = result.status
+                else:
+                    outcome = "vulnerable" if result.vulnerable else "not_vulnerable"
+                TEST_RESULTS.inc(api_type=api_type, test=test_name, outcome=outcome)
+                TEST_DURATION.observe(elapsed, api_type=api_type, test=test_name)
+                TEST_BYTES.observe(downloaded[0], api_type=api_type, test=test_name)
+                logger.info("test finished", extra={
+                    "test": test_name, "url": test_request.url, "outcome": outcome,
+                    "elapsed_ms": round(elapsed * 1000, 1), "bytes": downloaded[0]
+                })
+            if on_result:
+                await on_result(result)
+            return result
         
-        return results
\ No newline at end of file
+        # All tests of this scan share one baseline cache and one time budget
+        baselines_token = current_baselines.set(new_scan_baselines())
+        budget_token = current_budget.set(new_scan_budget(test_request.time_budget))
+        SCANS_IN_PROGRESS.inc()
+        try:
+            with start_trace(trace):
+                # gather keeps results in the order of test_request.tests
+                results = await asyncio.gather(*(run_one(name) for name in selected))
+        finally:
+            SCANS_IN_PROGRESS.dec()
+            current_budget.reset(budget_token)
+            current_baselines.reset(baselines_token)
+        return list(results)
\ No newline at end of file
@@ -1,40 +1,59 @@
 # backend/security_tests/soap_tests.py
-from typing import List
+import logging
+from typing import Optional
 from models import TestResult, APITestRequest
 from utils.api_client import make_api_request
+from utils.request_policy import ProbeAbortedError
+from .matchers import contains_sql_error
 from .custom_payloads import get_payloads
+from .payload_corpus import TIME_TAG
+from .fanout import first_match
+from .baseline import get_baseline
+from .ssrf import ssrf_indicators
+
+logger = logging.getLogger(__name__)
+
+def inject_soap_payload(test_request: APITestRequest, payload: str) -> str:
+    """Place the payload inside the SOAP body of the request"""
+    soap_body = test_request.body or "<soap:Envelope><soap:Body></soap:Body></soap:Envelope>"
+    return soap_body.replace("</soap:Body>", f"<test>{payload}</test></soap:Body>")
 
 async def test_soap_sql_injection(test_request: APITestRequest) -> TestResult:
-    payloads = get_payloads("sql", "SOAP")
-    for payload in payloads:
-        # Inject payload into SOAP body
-        soap_body = test_request.body or "<soap:Envelope><soap:Body></soap:Body></soap:Envelope>"
-        modified_body = soap_body.replace("</soap:Body>", f"<test>{payload}</test></soap:Body>")
-        
-        try:
-            response = await make_api_request(
-                method=test_request.method,
-                url=test_request.url,
-                headers=test_request.headers,
-                body=modified_body
-            )
-            if "sql" in response.text.lower() or "error" in response.text.lower():
-                return TestResult(
-                    test_name="SQL Injection (SOAP)",
-                    vulnerable=True,
-                    confidence=0.8,
-                    description=f"SQL Injection vulnerability detected with payload: {payload}",
-                    payload=payload,
-                    recommendation="Use parameterized queries and validate XML input"
-                )
-        except Exception as e:
+    payloads = get_payloads("sql", "SOAP", exclude_tags=[TIME_TAG])
+    
+    async def probe(payload: str) -> Optional[TestResult]:
+        response = await make_api_request(
+            method=test_request.method,
+            url=test_request.url,
+            headers=test_request.headers,
+            body=inject_soap_payload(test_request, payload)
+        )
+        if contains_sql_error(response.text):
             return TestResult(
                 test_name="SQL Injection (SOAP)",
-                vulnerable=False,
-                confidence=0.0,
-                description=f"Test failed: {str(e)}",
-                recommendation="Check SOAP request format"
+                vulnerable=True,
+                confidence=0.8,
+                description=f"SQL Injection vulnerability detected with payload: {payload}",
+                payload=payload,
+                recommendation="Use parameterized queries and validate XML input"
             )
+        return None
+    
+    try:
+        result = await first_match(payloads, probe)
+    except ProbeAbortedError:
+        raise
+    except Exception as e:
+        logger.warning("test_soap_sql_injection failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return TestResult(
+            test_name="SQL Injection (SOAP)",
+            vulnerable=False,
+            confidence=0.0,
+            description=f"Test failed: {str(e)}",
+            recommendation="Check SOAP request format"
+        )
+    if result:
+        return result
     
     return TestResult(
         test_name="SQL Injection (SOAP)",
@@ -46,34 +65,40 @@ async def test_soap_sql_injection(test_request: APITestRequest) -> TestResult:
 
 async def test_soap_xss(test_request: APITestRequest) -> TestResult:
     payloads = get_payloads("xss", "SOAP")
-    for payload in payloads:
-        soap_body = test_request.body or "<soap:Envelope><soap:Body></soap:Body></soap:Envelope>"
-        modified_body = soap_body.replace("</soap:Body>", f"<test>{payload}</test></soap:Body>")
-        
-        try:
-            response = await make_api_request(
-                method=test_request.method,
-                url=test_request.url,
-                headers=test_request.headers,
-                body=modified_body
-            )
-            if payload in response.text:
-                return TestResult(
-                    test_name="XSS (SOAP)",
-                    vulnerable=True,
-                    confidence=0.8,
-                    description=f"XSS vulnerability detected with payload: {payload}",
-                    payload=payload,
-                    recommendation="Sanitize XML input and implement Content Security Policy"
-                )
-        except Exception as e:
+    
+    async def probe(payload: str) -> Optional[TestResult]:
+        response = await make_api_request(
+            method=test_request.method,
+            url=test_request.url,
+            headers=test_request.headers,
+            body=inject_soap_payload(test_request, payload)
+        )
+        if payload in response.text:
             return TestResult(
                 test_name="XSS (SOAP)",
-                vulnerable=False,
-                confidence=0.0,
-                description=f"Test failed: {str(e)}",
-                recommendation="Check SOAP request format"
+                vulnerable=True,
+                confidence=0.8,
+                description=f"XSS vulnerability detected with payload: {payload}",
+                payload=payload,
+                recommendation="Sanitize XML input and implement Content Security Policy"
             )
+        return None
+    
+    try:
+        result = await first_match(payloads, probe)
+    except ProbeAbortedError:
+        raise
+    except Exception as e:
+        logger.warning("test_soap_xss failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return TestResult(
+            test_name="XSS (SOAP)",
+            vulnerable=False,
+            confidence=0.0,
+            description=f"Test failed: {str(e)}",
+            recommendation="Check SOAP request format"
+        )
+    if result:
+        return result
     
     return TestResult(
         test_name="XSS (SOAP)",
@@ -85,34 +110,42 @@ async def test_soap_xss(test_request: APITestRequest) -> TestResult:
 
 async def test_soap_ssrf(test_request: APITestRequest) -> TestResult:
     payloads = get_payloads("ssrf", "SOAP")
-    for payload in payloads:
-        soap_body = test_request.body or "<soap:Envelope><soap:Body></soap:Body></soap:Envelope>"
-        modified_body = soap_body.replace("</soap:Body>", f"<test>{payload}</test></soap:Body>")
-        
-        try:
-            response = await make_api_request(
-                method=test_request.method,
-                url=test_request.url,
-                headers=test_request.headers,
-                body=modified_body
-            )
-            if "metadata" in response.text.lower() or "localhost" in response.text.lower():
-                return TestResult(
-                    test_name="SSRF (SOAP)",
-                    vulnerable=True,
-                    confidence=0.8,
-                    description=f"SSRF vulnerability detected with payload: {payload}",
-                    payload=payload,
-                    recommendation="Restrict outbound connections and validate URLs in XML"
-                )
-        except Exception as e:
+    
+    async def probe(payload: str) -> Optional[TestResult]:
+        response = await make_api_request(
+            method=test_request.method,
+            url=test_request.url,
+            headers=test_request.headers,
+            body=inject_soap_payload(test_request, payload)
+        )
+        if ssrf_indicators(response.text) - baseline_indicators:
             return TestResult(
                 test_name="SSRF (SOAP)",
-                vulnerable=False,
-                confidence=0.0,
-                description=f"Test failed: {str(e)}",
-                recommendation="Check SOAP request format"
+                vulnerable=True,
+                confidence=0.8,
+                description=f"SSRF vulnerability detected with payload: {payload}",
+                payload=payload,
+                recommendation="Restrict outbound connections and validate URLs in XML"
             )
+        return None
+    
+    try:
+        # Indicators already in the unmodified response are not evidence of SSRF
+        baseline_indicators = ssrf_indicators((await get_baseline(test_request, samples=1)).text)
+        result = await first_match(payloads, probe)
+    except ProbeAbortedError:
+        raise
+    except Exception as e:
+        logger.warning("test_soap_ssrf failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return TestResult(
+            test_name="SSRF (SOAP)",
+            vulnerable=False,
+            confidence=0.0,
+            description=f"Test failed: {str(e)}",
+            recommendation="Check SOAP request format"
+        )
+    if result:
+        return result
     
     return TestResult(
         test_name="SSRF (SOAP)",
@@ -142,7 +175,10 @@ async def test_soap_xxe(test_request: APITestRequest) -> TestResult:
                 payload=xxe_payload,
                 recommendation="Disable external entity processing in XML parser"
             )
+    except ProbeAbortedError:
+        raise
     except Exception as e:
+        logger.warning("test_soap_xxe failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return TestResult(
             test_name="XXE (SOAP)",
             vulnerable=False,
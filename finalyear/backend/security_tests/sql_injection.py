@@ -1,112 +1,43 @@
-import time
-import re
 import logging
-from typing import Dict, Optional
+import statistics
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
 from utils.api_client import make_api_request
+from utils.request_policy import ProbeAbortedError, TargetUnreachableError
 from .custom_payloads import get_payloads
+from .payload_corpus import TIME_TAG
+from .matchers import RESPONSE_SIGNATURES
+from .response_diff import DIFF_ENGINE, DiffEngine
+from .baseline import get_baseline
+from .fanout import first_match
+from .timing import TimingOracle, TIMING_CONCURRENCY
 from models import TestResult, APITestRequest
-from difflib import SequenceMatcher
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Output is configured by utils.logging_config
 logger = logging.getLogger(__name__)
 
-# SQL error patterns for various databases
-SQL_ERROR_PATTERNS = [
-    r"SQL.*error",
-    r"ORA-[0-9]{5}",
-    r"MySQL.*error",
-    r"Syntax error",
-    r"unclosed quotation mark",
-    r"quoted string not properly terminated",
-    r"SQLiteException",
-    r"PostgreSQL.*ERROR",
-    r"Microsoft SQL Server",
-    r"ODBC Driver",
-    r"JDBC Driver",
-    r"PdoException",
-    r"SQL syntax",
-    r"Warning.*mysql",
-    r"Unclosed quotation mark",
-    r"Database error",
-    r"SQLSTATE\[",
-    r"Driver.*error",
-    r"SQL command not properly ended",
-    r"invalid SQL statement",
+# Time-based payloads; {delay} is the sleep in seconds chosen by the timing oracle
+TIME_BASED_PAYLOADS = [
+    "1' AND (SELECT * FROM (SELECT(SLEEP({delay}))))--",
+    "1' WAITFOR DELAY '0:0:{delay}'--",
+    "1' OR BENCHMARK({benchmark},MD5(NOW()))--",
+    "1' AND MAKE_SET(1=1,SLEEP({delay}))--",
+    "1'; SELECT PG_SLEEP({delay})--"
 ]
-
-# Sensitive data patterns that might indicate information leakage
-SENSITIVE_DATA_PATTERNS = [
-    r"password",
-    r"credit_card",
-    r"ssn",
-    r"secret",
-    r"token",
-    r"private",
-    r"auth",
-    r"session",
-]
-
-def contains_sql_error(response_text: str) -> bool:
-    """Check if response contains SQL error patterns"""
-    response_text = response_text.lower()
-    return any(re.search(pattern, response_text, re.IGNORECASE) for pattern in SQL_ERROR_PATTERNS)
-
-def contains_sensitive_data(response_text: str) -> bool:
-    """Check if response contains sensitive data patterns"""
-    response_text = response_text.lower()
-    return any(re.search(pattern, response_text) for pattern in SENSITIVE_DATA_PATTERNS)
+# Rough BENCHMARK() iterations per second of delay on MySQL
+BENCHMARK_ROUNDS_PER_SECOND = 1000000
 
 def response_differs_significantly(baseline: dict, current: dict, threshold: float = 0.3) -> bool:
     """
     Compare responses for significant differences in:
     - Status code
     - Response length
-    - JSON structure (if applicable)
+    - JSON structure (objects and arrays)
     - Content similarity
     """
-    # Compare status codes
-    if baseline["status"] != current["status"]:
-        return True
-    
-    # Compare response length (more than 30% difference)
-    length_diff = abs(len(baseline["text"]) - len(current["text"]))
-    if length_diff > (len(baseline["text"]) * threshold):
-        return True
-    
-    # For JSON responses, compare structure
-    try:
-        import json
-        baseline_json = json.loads(baseline["text"])
-        current_json = json.loads(current["text"])
-        
-        # If structure changed (different keys)
-        if set(baseline_json.keys()) != set(current_json.keys()):
-            return True
-            
-        # If array length changed significantly
-        if isinstance(baseline_json, list) and isinstance(current_json, list):
-            if abs(len(baseline_json) - len(current_json)) > 3:
-                return True
-    except:
-        pass
-    
-    # Compare content similarity
-    similarity = SequenceMatcher(None, baseline["text"], current["text"]).ratio()
-    if similarity < 0.7:  # More than 30% different
-        return True
-    
-    return False
-
-async def measure_response_time(request_func, *args, **kwargs) -> float:
-    """Measure response time with statistical significance (median of 3 requests)"""
-    times = []
-    for _ in range(3):  # Take multiple measurements
-        start = time.time()
-        await request_func(*args, **kwargs)
-        times.append(time.time() - start)
-    
-    return sorted(times)[len(times)//2]  # Return median
+    engine = DIFF_ENGINE if threshold == DIFF_ENGINE.threshold else DiffEngine(threshold=threshold)
+    return engine.differs(baseline, current)
 
 async def test_boolean_based(test_request: APITestRequest, param_key: str, baseline: dict) -> Optional[TestResult]:
     """Test for boolean-based SQL injection"""
@@ -140,7 +71,7 @@ async def test_boolean_based(test_request: APITestRequest, param_key: str, basel
             "text": false_response.text
         }
         
-        if response_differs_significantly(true_data, false_data):
+        if await DIFF_ENGINE.differs_async(true_data, false_data):
             return TestResult(
                 test_name="SQL Injection (Boolean-Based)",
                 vulnerable=True,
@@ -150,8 +81,10 @@ async def test_boolean_based(test_request: APITestRequest, param_key: str, basel
                 recommendation="Use parameterized queries"
             )
             
+    except ProbeAbortedError:
+        raise
     except Exception as e:
-        logger.error(f"Boolean-based test failed: {str(e)}")
+        logger.warning("Boolean-based test failed: %s", e)
     
     return None
 
@@ -165,10 +98,10 @@ async def test_sql_injection(test_request: APITestRequest) -> TestResult:
             recommendation="N/A"
         )
     
-    payloads = get_payloads("sql", "REST")
+    payloads = get_payloads("sql", "REST", exclude_tags=[TIME_TAG])
     
     # Log the initial request
-    logger.info(f"Testing SQL injection on {test_request.url} with params {test_request.params}")
+    logger.info("Testing SQL injection", extra={"url": test_request.url, "params": dict(test_request.params)})
     
     # Find the parameter to inject the payload into
     param_key = next(iter(test_request.params), None) if test_request.params else "id"
@@ -182,37 +115,20 @@ async def test_sql_injection(test_request: APITestRequest) -> TestResult:
             recommendation="Ensure the API request includes query parameters"
         )
     
-    # Get baseline response
+    # Get baseline response and latency from the scan's shared baseline cache
     try:
-        baseline_response = await make_api_request(
-            method=test_request.method,
-            url=test_request.url,
-            headers=test_request.headers,
-            params=test_request.params,
-            body=test_request.body
-        )
+        baseline = await get_baseline(test_request)
+        baseline_data = baseline.response
         
-        baseline_data = {
-            "status": baseline_response.status_code,
-            "text": baseline_response.text,
-            "headers": dict(baseline_response.headers)
-        }
+        logger.debug("Baseline response: status=%s, length=%d", baseline_data["status"], len(baseline_data["text"]))
         
-        logger.info(f"Baseline response: status={baseline_data['status']}, length={len(baseline_data['text'])}")
-        
-        # Measure baseline response time
-        baseline_time = await measure_response_time(
-            make_api_request,
-            method=test_request.method,
-            url=test_request.url,
-            headers=test_request.headers,
-            params=test_request.params,
-            body=test_request.body
-        )
-        logger.info(f"Baseline response time: {baseline_time:.2f}s")
+        baseline_time = baseline.median_latency
+        logger.debug("Baseline response time: %.2fs", baseline_time)
         
+    except ProbeAbortedError:
+        raise
     except Exception as e:
-        logger.error(f"Failed to get baseline response: {str(e)}")
+        logger.warning("Failed to get baseline response: %s", e)
         return TestResult(
             test_name="SQL Injection (REST)",
             vulnerable=False,
@@ -221,18 +137,19 @@ async def test_sql_injection(test_request: APITestRequest) -> TestResult:
             recommendation="Check the API endpoint and request format"
         )
 
+    oracle = TimingOracle(baseline)
+
     # First run boolean-based test
     boolean_result = await test_boolean_based(test_request, param_key, baseline_data)
     if boolean_result:
         return boolean_result
 
-    # Test each standard payload
-    for payload in payloads:
+    # Error, data exposure, content and delay checks per payload, a bounded
+    # number in flight; the earliest payload (in corpus order) that hits wins
+    async def probe_payload(payload: str) -> Optional[TestResult]:
         modified_params = {**test_request.params, param_key: payload}
         
         try:
-            # Time measurement
-            start_time = time.time()
             response = await make_api_request(
                 method=test_request.method,
                 url=test_request.url,
@@ -240,7 +157,8 @@ async def test_sql_injection(test_request: APITestRequest) -> TestResult:
                 params=modified_params,
                 body=test_request.body
             )
-            elapsed_time = time.time() - start_time
+            # Round trip only, so throttle waits and Retry-After pauses never look like a delay
+            elapsed_time = response.elapsed.total_seconds()
             
             response_data = {
                 "status": response.status_code,
@@ -248,35 +166,38 @@ async def test_sql_injection(test_request: APITestRequest) -> TestResult:
                 "headers": dict(response.headers)
             }
             
-            logger.info(f"Testing payload: {payload[:50]}...")
-            logger.debug(f"Response status: {response_data['status']}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Tested payload %.50s: status %s", payload, response_data["status"])
+            
+            # One pass over the body finds both SQL errors and sensitive data
+            signatures = RESPONSE_SIGNATURES.scan(response_data["text"])
             
             # 1. Check for SQL errors in response
-            if contains_sql_error(response_data["text"]):
-                logger.info("SQL error detected in response")
+            if signatures.get("sql_error"):
+                logger.info("SQL error detected in response: %s", signatures["sql_error"])
                 return TestResult(
                     test_name="SQL Injection (Error-Based)",
                     vulnerable=True,
                     confidence=0.95,
-                    description=f"Error-based SQL Injection detected with payload: {payload}",
+                    description=f"Error-based SQL Injection detected with payload: {payload} (matched: {', '.join(signatures['sql_error'])})",
                     payload=payload,
                     recommendation="Use parameterized queries"
                 )
             
             # 2. Check for sensitive data exposure
-            if contains_sensitive_data(response_data["text"]):
-                logger.info("Sensitive data detected in response")
+            if signatures.get("sensitive_data"):
+                logger.info("Sensitive data detected in response: %s", signatures["sensitive_data"])
                 return TestResult(
                     test_name="SQL Injection (Data Exposure)",
                     vulnerable=True,
                     confidence=0.9,
-                    description=f"Sensitive data exposed with payload: {payload}",
+                    description=f"Sensitive data exposed with payload: {payload} (matched: {', '.join(signatures['sensitive_data'])})",
                     payload=payload,
                     recommendation="Implement proper data access controls"
                 )
             
             # 3. Check for content differences
-            if response_differs_significantly(baseline_data, response_data):
+            if await DIFF_ENGINE.differs_async(baseline_data, response_data):
                 logger.info("Significant content differences detected")
                 return TestResult(
                     test_name="SQL Injection (Content-Based)",
@@ -287,25 +208,53 @@ async def test_sql_injection(test_request: APITestRequest) -> TestResult:
                     recommendation="Validate all inputs"
                 )
             
-            # 4. Check for time delays
+            # 4. Check for time delays, confirmed by re-sending the payload
             time_threshold = max(4, baseline_time * 2)  # Either >4s or 2x baseline
             if elapsed_time > time_threshold:
-                logger.info(f"Time delay detected: {elapsed_time:.2f}s > {time_threshold:.2f}s")
-                return TestResult(
-                    test_name="SQL Injection (Time-Based)",
-                    vulnerable=True,
-                    confidence=0.85,
-                    description=f"Time delay detected ({elapsed_time:.2f}s) with payload: {payload}",
-                    payload=payload,
-                    recommendation="Implement query timeouts"
-                )
+                async def resend(params=modified_params):
+                    return await make_api_request(
+                        method=test_request.method,
+                        url=test_request.url,
+                        headers=test_request.headers,
+                        params=params,
+                        body=test_request.body
+                    )
                 
+                delayed, _ = await oracle.is_delayed(resend, elapsed_time - baseline.mean_latency)
+                if delayed:
+                    logger.info("Time delay confirmed: %.2fs > %.2fs", elapsed_time, time_threshold)
+                    return TestResult(
+                        test_name="SQL Injection (Time-Based)",
+                        vulnerable=True,
+                        confidence=0.85,
+                        description=f"Time delay detected ({elapsed_time:.2f}s) with payload: {payload}",
+                        payload=payload,
+                        recommendation="Implement query timeouts"
+                    )
+                
+        except ProbeAbortedError:
+            raise
         except Exception as e:
             error_msg = str(e).lower()
-            logger.error(f"Test failed with payload '{payload}': {error_msg}")
+            logger.warning("Test failed with payload %r: %s", payload, error_msg)
             
-            # Consider some exceptions as potential indicators
-            if "timeout" in error_msg or "connection reset" in error_msg:
+            # A payload that stalls or drops the connection is a potential indicator,
+            # but only if the target still answers the unmodified request
+            if isinstance(e, (httpx.ReadTimeout, httpx.ReadError, httpx.RemoteProtocolError)):
+                try:
+                    await make_api_request(
+                        method=test_request.method,
+                        url=test_request.url,
+                        headers=test_request.headers,
+                        params=test_request.params,
+                        body=test_request.body
+                    )
+                except ProbeAbortedError:
+                    raise
+                except Exception as recheck_error:
+                    raise TargetUnreachableError(
+                        urlsplit(test_request.url).netloc, f"stopped responding ({str(recheck_error) or type(recheck_error).__name__})"
+                    ) from recheck_error
                 return TestResult(
                     test_name="SQL Injection (Potential)",
                     vulnerable=True,
@@ -314,54 +263,51 @@ async def test_sql_injection(test_request: APITestRequest) -> TestResult:
                     payload=payload,
                     recommendation="Investigate server logs"
                 )
+        return None
+    
+    result = await first_match(payloads, probe_payload)
+    if result:
+        return result
     
     # Time-based SQL injection detection (specific sleep/delay payloads)
-    time_based_payloads = [
-        "1' AND (SELECT * FROM (SELECT(SLEEP(5)))--",
-        "1' WAITFOR DELAY '0:0:5'--",
-        "1' OR BENCHMARK(5000000,MD5(NOW()))--",
-        "1' AND MAKE_SET(1=1,SLEEP(5))--",
-        "1'; SELECT PG_SLEEP(5)--"
-    ]
+    delay = oracle.sleep_seconds()
     
-    for payload in time_based_payloads:
-        try:
-            start_time = time.time()
-            modified_params = {**test_request.params, param_key: payload}
-            await make_api_request(
+    async def probe_delay(template: str) -> Optional[TestResult]:
+        payload = template.format(delay=delay, benchmark=delay * BENCHMARK_ROUNDS_PER_SECOND)
+        modified_params = {**test_request.params, param_key: payload}
+        
+        async def send():
+            return await make_api_request(
                 method=test_request.method,
                 url=test_request.url,
                 headers=test_request.headers,
                 params=modified_params,
                 body=test_request.body
             )
-            elapsed_time = time.time() - start_time
-            
-            # Dynamic threshold - either 5 seconds or 3x baseline time
-            time_threshold = max(5, baseline_time * 3) if 'baseline_time' in locals() else 5
-            
-            if elapsed_time > time_threshold:
-                logger.info(f"Time-based SQLi detected - delay: {elapsed_time:.2f}s with payload: {payload}")
-                return TestResult(
-                    test_name="SQL Injection (Time-Based)",
-                    vulnerable=True,
-                    confidence=0.9,
-                    description=f"Time-based SQL Injection detected (delay: {elapsed_time:.2f}s) with payload: {payload}",
-                    payload=payload,
-                    recommendation="Use parameterized queries and implement query timeouts"
-                )
+        
+        try:
+            delayed, samples = await oracle.is_delayed(send, delay)
+        except ProbeAbortedError:
+            raise
         except Exception as e:
-            if "timeout" in str(e).lower():
-                logger.info(f"Timeout occurred with time-based payload: {payload}")
-                return TestResult(
-                    test_name="SQL Injection (Time-Based)",
-                    vulnerable=True,
-                    confidence=0.85,
-                    description=f"Request timeout with time-based payload: {payload}",
-                    payload=payload,
-                    recommendation="Implement query timeouts and review SQL injection protections"
-                )
-            continue
+            logger.warning("Time-based test failed with payload %r: %s", payload, e)
+            return None
+        if delayed:
+            observed = statistics.median(samples)
+            logger.info("Time-based SQLi detected - delay: %.2fs with payload: %s", observed, payload)
+            return TestResult(
+                test_name="SQL Injection (Time-Based)",
+                vulnerable=True,
+                confidence=0.9,
+                description=f"Time-based SQL Injection detected (median response {observed:.2f}s over {len(samples)} samples, baseline {baseline.mean_latency:.2f}s, injected sleep {delay}s) with payload: {payload}",
+                payload=payload,
+                recommendation="Use parameterized queries and implement query timeouts"
+            )
+        return None
+    
+    time_based_result = await first_match(TIME_BASED_PAYLOADS, probe_delay, concurrency=TIMING_CONCURRENCY)
+    if time_based_result:
+        return time_based_result
 
     # Final return if no vulnerabilities found
     logger.info("No SQL injection vulnerabilities detected")
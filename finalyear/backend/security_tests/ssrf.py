@@ -1,8 +1,22 @@
 # backend/security_tests/ssrf.py
-from typing import List
+import logging
+from typing import Optional
 from models import TestResult, APITestRequest
 from utils.api_client import make_api_request
+from utils.request_policy import ProbeAbortedError
 from .custom_payloads import get_payloads
+from .fanout import first_match
+from .baseline import get_baseline
+
+logger = logging.getLogger(__name__)
+
+# Words in a response that suggest the server fetched an internal resource
+SSRF_INDICATORS = ("metadata", "localhost")
+
+def ssrf_indicators(response_text: str) -> set:
+    """SSRF indicator words present in a response"""
+    text = response_text.lower()
+    return {word for word in SSRF_INDICATORS if word in text}
 
 async def test_ssrf(test_request: APITestRequest) -> TestResult:
     if test_request.api_type != "REST":
@@ -15,33 +29,44 @@ async def test_ssrf(test_request: APITestRequest) -> TestResult:
         )
     
     payloads = get_payloads("ssrf", "REST")
-    for payload in payloads:
+    
+    async def probe(payload: str) -> Optional[TestResult]:
         modified_params = {**test_request.params, "url": payload}
-        try:
-            response = await make_api_request(
-                method=test_request.method,
-                url=test_request.url,
-                headers=test_request.headers,
-                params=modified_params,
-                body=test_request.body
-            )
-            if "metadata" in response.text.lower() or "localhost" in response.text.lower():
-                return TestResult(
-                    test_name="SSRF (REST)",
-                    vulnerable=True,
-                    confidence=0.8,
-                    description=f"SSRF vulnerability detected with payload: {payload}",
-                    payload=payload,
-                    recommendation="Restrict outbound connections and validate URLs"
-                )
-        except Exception as e:
+        response = await make_api_request(
+            method=test_request.method,
+            url=test_request.url,
+            headers=test_request.headers,
+            params=modified_params,
+            body=test_request.body
+        )
+        if ssrf_indicators(response.text) - baseline_indicators:
             return TestResult(
                 test_name="SSRF (REST)",
-                vulnerable=False,
-                confidence=0.0,
-                description=f"Test failed: {str(e)}",
-                recommendation="Check request format"
+                vulnerable=True,
+                confidence=0.8,
+                description=f"SSRF vulnerability detected with payload: {payload}",
+                payload=payload,
+                recommendation="Restrict outbound connections and validate URLs"
             )
+        return None
+    
+    try:
+        # Indicators already in the unmodified response are not evidence of SSRF
+        baseline_indicators = ssrf_indicators((await get_baseline(test_request, samples=1)).text)
+        result = await first_match(payloads, probe)
+    except ProbeAbortedError:
+        raise
+    except Exception as e:
+        logger.warning("test_ssrf failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return TestResult(
+            test_name="SSRF (REST)",
+            vulnerable=False,
+            confidence=0.0,
+            description=f"Test failed: {str(e)}",
+            recommendation="Check request format"
+        )
+    if result:
+        return result
     
     return TestResult(
         test_name="SSRF (REST)",
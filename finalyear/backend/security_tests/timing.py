@@ -0,0 +1,88 @@
+# backend/security_tests/timing.py
+import math
+import os
+import time
+from typing import Awaitable, Callable, List, Tuple
+import httpx
+from .baseline import Baseline
+
+# Sleep durations (seconds) used by time-based payloads
+MIN_SLEEP = int(os.getenv("SCANNER_TIMING_MIN_SLEEP", "1"))
+MAX_SLEEP = int(os.getenv("SCANNER_TIMING_MAX_SLEEP", "10"))
+# The injected sleep is at least this many baseline standard deviations
+JITTER_MULTIPLIER = float(os.getenv("SCANNER_TIMING_JITTER_MULTIPLIER", "10"))
+# Floor for the measured jitter, so a very steady baseline does not make every spike significant
+MIN_JITTER = float(os.getenv("SCANNER_TIMING_MIN_JITTER", "0.05"))
+# Upper bound on samples per payload before giving up as inconclusive
+MAX_SAMPLES = int(os.getenv("SCANNER_TIMING_MAX_SAMPLES", "5"))
+# Delayed samples needed before a payload can be reported, however large the delay
+MIN_CONFIRMATIONS = 2
+# How many time-based payloads are probed at once
+TIMING_CONCURRENCY = int(os.getenv("SCANNER_TIMING_CONCURRENCY", "3"))
+
+class TimingOracle:
+    """
+    Decides whether a payload delays responses, using a sequential probability ratio test.
+
+    Each sample is scored against two hypotheses built from the baseline latency:
+    H0 "no delay" (mean latency) and H1 "delayed" (mean latency + injected sleep).
+    Sampling stops as soon as the evidence crosses either bound, so a clean payload
+    usually costs one request and a delayed one MIN_CONFIRMATIONS requests.
+    """
+
+    def __init__(
+        self,
+        baseline: Baseline,
+        false_positive_rate: float = 0.01,
+        false_negative_rate: float = 0.05,
+        max_samples: int = MAX_SAMPLES
+    ):
+        self.mean = baseline.mean_latency
+        self.jitter = max(baseline.latency_stdev, MIN_JITTER)
+        self.max_samples = max_samples
+        self.accept_delayed = math.log((1 - false_negative_rate) / false_positive_rate)
+        self.accept_clean = math.log(false_negative_rate / (1 - false_positive_rate))
+        # A single outlier may never carry more than its share of the evidence
+        self.max_step = self.accept_delayed / MIN_CONFIRMATIONS
+
+    def sleep_seconds(self) -> int:
+        """Sleep long enough to stand well clear of the target's jitter"""
+        return min(MAX_SLEEP, max(MIN_SLEEP, math.ceil(JITTER_MULTIPLIER * self.jitter)))
+
+    def evidence(self, latency: float, delay: float) -> float:
+        """Log-likelihood ratio of H1 over H0 for one latency sample"""
+        ratio = (
+            (latency - self.mean) ** 2 - (latency - self.mean - delay) ** 2
+        ) / (2 * self.jitter ** 2)
+        return max(self.accept_clean, min(self.max_step, ratio))
+
+    @staticmethod
+    async def timed(send: Callable[[], Awaitable]) -> float:
+        """
+        Network latency of one request; a timeout counts as a (long) observation.
+        Time spent queued by the host throttle is excluded, so rate limiting is
+        never mistaken for an injected delay.
+        """
+        start = time.perf_counter()
+        try:
+            response = await send()
+        except httpx.TimeoutException as e:
+            return getattr(e, "network_latency", time.perf_counter() - start)
+        if isinstance(response, httpx.Response):
+            return response.elapsed.total_seconds()
+        return time.perf_counter() - start
+
+    async def is_delayed(self, send: Callable[[], Awaitable], delay: float) -> Tuple[bool, List[float]]:
+        """Sample send() until the delay is confirmed or ruled out; returns the verdict and samples"""
+        score = 0.0
+        samples: List[float] = []
+        for _ in range(self.max_samples):
+            latency = await self.timed(send)
+            samples.append(latency)
+            score += self.evidence(latency, delay)
+            if score >= self.accept_delayed - 1e-9:
+                return True, samples
+            if score <= self.accept_clean:
+                return False, samples
+        # Inconclusive after max_samples: do not report a finding
+        return False, samples
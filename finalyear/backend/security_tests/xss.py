@@ -1,8 +1,13 @@
 # backend/security_tests/xss.py
-from typing import List
+import logging
+from typing import Optional
 from models import TestResult, APITestRequest
 from utils.api_client import make_api_request
+from utils.request_policy import ProbeAbortedError
 from .custom_payloads import get_payloads
+from .fanout import first_match
+
+logger = logging.getLogger(__name__)
 
 async def test_xss(test_request: APITestRequest) -> TestResult:
     if test_request.api_type != "REST":
@@ -15,33 +20,42 @@ async def test_xss(test_request: APITestRequest) -> TestResult:
         )
     
     payloads = get_payloads("xss", "REST")
-    for payload in payloads:
+    
+    async def probe(payload: str) -> Optional[TestResult]:
         modified_params = {**test_request.params, "test": payload}
-        try:
-            response = await make_api_request(
-                method=test_request.method,
-                url=test_request.url,
-                headers=test_request.headers,
-                params=modified_params,
-                body=test_request.body
-            )
-            if payload in response.text:
-                return TestResult(
-                    test_name="XSS (REST)",
-                    vulnerable=True,
-                    confidence=0.8,
-                    description=f"XSS vulnerability detected with payload: {payload}",
-                    payload=payload,
-                    recommendation="Implement input sanitization and CSP headers"
-                )
-        except Exception as e:
+        response = await make_api_request(
+            method=test_request.method,
+            url=test_request.url,
+            headers=test_request.headers,
+            params=modified_params,
+            body=test_request.body
+        )
+        if payload in response.text:
             return TestResult(
                 test_name="XSS (REST)",
-                vulnerable=False,
-                confidence=0.0,
-                description=f"Test failed: {str(e)}",
-                recommendation="Check request format"
+                vulnerable=True,
+                confidence=0.8,
+                description=f"XSS vulnerability detected with payload: {payload}",
+                payload=payload,
+                recommendation="Implement input sanitization and CSP headers"
             )
+        return None
+    
+    try:
+        result = await first_match(payloads, probe)
+    except ProbeAbortedError:
+        raise
+    except Exception as e:
+        logger.warning("test_xss failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return TestResult(
+            test_name="XSS (REST)",
+            vulnerable=False,
+            confidence=0.0,
+            description=f"Test failed: {str(e)}",
+            recommendation="Check request format"
+        )
+    if result:
+        return result
     
     return TestResult(
         test_name="XSS (REST)",
@@ -0,0 +1,68 @@
+# backend/tests/conftest.py
+import atexit
+import os
+import shutil
+import tempfile
+from datetime import datetime
+import pytest
+
+# main.py opens the database at import time, so point it at a scratch directory first
+SCRATCH_DIR = tempfile.mkdtemp(prefix="scanner-tests-")
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(SCRATCH_DIR, 'test.db')}")
+os.environ.setdefault("RESULT_ARCHIVE_DIR", os.path.join(SCRATCH_DIR, "archive"))
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def db():
+    """Sync session on a fresh in-memory database"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from models import Base
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    """Empty result archive for the test"""
+    import retention
+
+    monkeypatch.setattr(retention, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    return tmp_path / "archive"
+
+@pytest.fixture
+def make_result():
+    """Factory for test_results rows, as result_rows() builds them"""
+    def make(user_id: int, created_at: datetime, **values) -> dict:
+        row = {
+            "user_id": user_id,
+            "test_name": "sql",
+            "api_type": "REST",
+            "url": "http://target.test/items",
+            "vulnerable": False,
+            "confidence": 0.0,
+            "description": "",
+            "payload": None,
+            "recommendation": "",
+            "status": "completed",
+            "trace_id": None,
+            "created_at": created_at
+        }
+        row.update(values)
+        return row
+    return make
@@ -0,0 +1,61 @@
+# backend/tests/test_fanout.py
+import asyncio
+import pytest
+from security_tests.fanout import first_match
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_returns_earliest_hit_in_payload_order():
+    # Payload 1 finishes first but payload 0 is earlier in order, so it wins
+    delays = {0: 0.03, 1: 0.0, 2: 0.01}
+
+    async def probe(payload):
+        await asyncio.sleep(delays[payload])
+        return f"hit {payload}"
+
+    assert run(first_match([0, 1, 2], probe, concurrency=3)) == "hit 0"
+
+def test_later_probes_are_cancelled_once_an_earlier_one_hits():
+    started, cancelled = [], []
+
+    async def probe(payload):
+        started.append(payload)
+        if payload == 0:
+            await asyncio.sleep(0.01)
+            return "hit"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(payload)
+            raise
+        return None
+
+    assert run(first_match(range(100), probe, concurrency=3)) == "hit"
+    # Nothing past the first window is started, and the window is cancelled
+    assert started == [0, 1, 2]
+    assert sorted(cancelled) == [1, 2]
+
+def test_earlier_probes_in_flight_are_awaited():
+    async def probe(payload):
+        if payload == 1:
+            return "late hit"
+        await asyncio.sleep(0.02)
+        return "early hit" if payload == 0 else None
+
+    assert run(first_match([0, 1], probe, concurrency=2)) == "early hit"
+
+def test_no_hit_returns_none():
+    async def probe(payload):
+        return None
+
+    assert run(first_match(range(10), probe, concurrency=4)) is None
+
+def test_error_from_the_decisive_probe_is_raised():
+    async def probe(payload):
+        if payload == 1:
+            raise ValueError("boom")
+        return None
+
+    with pytest.raises(ValueError, match="boom"):
+        run(first_match(range(5), probe, concurrency=2))
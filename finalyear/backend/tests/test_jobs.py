@@ -0,0 +1,10 @@
+# backend/tests/test_jobs.py
+import pytest
+from jobs import JobManager
+from models import APITestRequest
+
+def test_submit_before_start_is_an_error():
+    manager = JobManager(workers=1, backend="asyncio")
+    with pytest.raises(RuntimeError, match="not started"):
+        manager.submit(1, [APITestRequest(api_type="REST", url="http://target.test/")])
+    assert manager.jobs == {}
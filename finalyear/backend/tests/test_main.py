@@ -0,0 +1,112 @@
+# backend/tests/test_main.py
+import uuid
+from datetime import datetime, timedelta
+import pytest
+
+def test_app_starts_and_serves_metrics(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "scanner_" in response.text
+
+def new_user():
+    """A new user and its auth headers: (user id, headers)"""
+    import main
+    from models import User
+
+    name = f"user-{uuid.uuid4().hex[:8]}"
+    db = main.SessionLocal()
+    try:
+        db_user = User(username=name, email=f"{name}@example.com", hashed_password="unused")
+        db.add(db_user)
+        db.commit()
+        user_id = db_user.id
+    finally:
+        db.close()
+    return user_id, {"Authorization": f"Bearer {main.create_access_token({'sub': name})}"}
+
+@pytest.fixture
+def user(client):
+    return new_user()
+
+@pytest.fixture
+def stored_results(user, make_result):
+    """Five results for the user, an hour apart, of which the odd ones are vulnerable XSS on GraphQL"""
+    import main
+    from results_store import bulk_insert_results
+
+    user_id, _ = user
+    start = datetime(2024, 1, 1)
+    rows = [
+        make_result(user_id, start + timedelta(hours=index), vulnerable=True, confidence=0.9, test_name="xss", api_type="GraphQL")
+        if index % 2 else make_result(user_id, start + timedelta(hours=index))
+        for index in range(5)
+    ]
+    db = main.SessionLocal()
+    try:
+        bulk_insert_results(db, rows)
+    finally:
+        db.close()
+    return rows
+
+def fetch_all(client, headers, **params):
+    """Every page of /api/results, following X-Next-Cursor; returns the pages"""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get("/api/results", params=query, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+def test_results_cursor_chain_visits_every_row_once(client, user, stored_results):
+    _, headers = user
+    pages = fetch_all(client, headers, limit=1)
+    assert [len(page) for page in pages] == [1] * len(stored_results)
+    created = [page[0]["created_at"] for page in pages]
+    assert created == sorted(created)
+    assert len({page[0]["id"] for page in pages}) == len(stored_results)
+
+def test_results_last_full_page_has_no_cursor(client, user, stored_results):
+    _, headers = user
+    response = client.get("/api/results", params={"limit": len(stored_results)}, headers=headers)
+    assert len(response.json()) == len(stored_results)
+    assert "X-Next-Cursor" not in response.headers
+
+def test_results_filters(client, user, stored_results):
+    _, headers = user
+    get = lambda **params: client.get("/api/results", params=params, headers=headers).json()
+    assert len(get(vulnerable="true")) == 2
+    assert {row["test_name"] for row in get(test_name="xss")} == {"xss"}
+    assert len(get(api_type="REST")) == 3
+    window = get(created_from="2024-01-01T01:00:00", created_to="2024-01-01T03:00:00")
+    assert [row["created_at"] for row in window] == ["2024-01-01T01:00:00", "2024-01-01T02:00:00"]
+    # Filters and pagination together
+    pages = fetch_all(client, headers, limit=1, vulnerable="true")
+    assert [len(page) for page in pages] == [1, 1]
+
+def test_results_bad_cursor(client, user):
+    _, headers = user
+    assert client.get("/api/results", params={"cursor": "nope"}, headers=headers).status_code == 400
+
+def test_results_are_per_user(client, stored_results):
+    _, other_headers = new_user()
+    assert client.get("/api/results", headers=other_headers).json() == []
+
+def test_archived_results_are_listed_and_exported(client, user, make_result, monkeypatch, tmp_path):
+    import retention
+
+    user_id, headers = user
+    monkeypatch.setattr(retention, "ARCHIVE_DIR", str(tmp_path))
+    retention.write_archive(user_id, "2023-05", [
+        dict(make_result(user_id, None, vulnerable=index == 0), id=index, created_at=f"2023-05-0{index + 1}T00:00:00")
+        for index in range(2)
+    ])
+    months = client.get("/api/results/archive", headers=headers).json()
+    assert [entry["month"] for entry in months] == ["2023-05"]
+    response = client.get("/api/results/archive/2023-05", params={"vulnerable": "true"}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 1
+    assert client.get("/api/results/archive/2023-06", headers=headers).status_code == 404
@@ -0,0 +1,19 @@
+# backend/tests/test_matchers.py
+from security_tests.matchers import RESPONSE_SIGNATURES, contains_sensitive_data, contains_sql_error
+
+def test_sql_error_does_not_hide_sensitive_data():
+    # "SQL.*error" spans the whole line; "session" inside it must still count
+    assert contains_sensitive_data("SQL error in session handler: error")
+    assert contains_sql_error("SQL error in session handler: error")
+
+def test_overlapping_signatures_across_categories():
+    text = "Warning: invalid token for mysql"
+    assert contains_sensitive_data(text)
+    assert contains_sql_error(text)
+    found = RESPONSE_SIGNATURES.scan(text)
+    assert "token" in found["sensitive_data"]
+    assert found["sql_error"]
+
+def test_no_match():
+    assert RESPONSE_SIGNATURES.scan("all good") == {}
+    assert RESPONSE_SIGNATURES.first("all good", "sql_error") is None
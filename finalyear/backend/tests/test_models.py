@@ -0,0 +1,25 @@
+# backend/tests/test_models.py
+import pytest
+from pydantic import ValidationError
+from models import APITestRequest, RateLimitConfig
+
+def test_rate_limit_defaults_are_valid():
+    config = RateLimitConfig()
+    assert config.model == "open"
+    assert config.concurrency >= 1
+
+@pytest.mark.parametrize("field, value", [
+    ("concurrency", 0),
+    ("start_rps", 0),
+    ("end_rps", -5),
+    ("duration", 0),
+    ("max_requests", 0),
+    ("model", "bursty"),
+])
+def test_invalid_rate_limit_config_is_rejected(field, value):
+    with pytest.raises(ValidationError):
+        RateLimitConfig(**{field: value})
+
+def test_invalid_rate_limit_config_rejected_in_scan_request():
+    with pytest.raises(ValidationError):
+        APITestRequest(api_type="REST", url="http://example.com", rate_limit={"concurrency": 0})
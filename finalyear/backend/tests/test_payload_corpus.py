@@ -0,0 +1,15 @@
+# backend/tests/test_payload_corpus.py
+from security_tests.custom_payloads import get_payloads
+from security_tests.payload_corpus import PayloadCorpus, TIME_TAG
+
+def test_excluded_tags_skip_generic_payloads_too(tmp_path):
+    folder = tmp_path / "sql"
+    folder.mkdir()
+    (folder / "generic.txt").write_text("' OR 1=1 --\n#tags: time\n1' WAITFOR DELAY '0:0:10' --\n")
+    corpus = PayloadCorpus([str(tmp_path)])
+    assert list(corpus.payloads("sql", tags=[], mutations=[])) == ["' OR 1=1 --", "1' WAITFOR DELAY '0:0:10' --"]
+    assert list(corpus.payloads("sql", tags=[], mutations=[], exclude_tags=[TIME_TAG])) == ["' OR 1=1 --"]
+
+def test_sql_probes_send_no_fixed_sleeps():
+    for payload in get_payloads("sql", "REST", exclude_tags=[TIME_TAG]):
+        assert "SLEEP(" not in payload.upper() and "WAITFOR DELAY" not in payload.upper()
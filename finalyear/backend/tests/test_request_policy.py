@@ -0,0 +1,75 @@
+# backend/tests/test_request_policy.py
+import time
+import httpx
+import pytest
+from utils.request_policy import (
+    CircuitBreaker, ScanBudget, ScanBudgetExceeded, TargetUnreachableError,
+    current_budget, new_scan_budget, request_timeout
+)
+
+def open_breaker(cooldown: float = 30) -> CircuitBreaker:
+    breaker = CircuitBreaker("target.test", threshold=3, cooldown=cooldown)
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record_failure(httpx.ConnectError("refused"))
+    return breaker
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = open_breaker()
+    assert breaker.state == "open"
+    with pytest.raises(TargetUnreachableError, match="3 consecutive failures"):
+        breaker.before_request()
+
+def test_breaker_stays_closed_below_threshold():
+    breaker = CircuitBreaker("target.test", threshold=3)
+    breaker.record_failure(httpx.ConnectError("refused"))
+    breaker.record_failure(httpx.ConnectError("refused"))
+    breaker.record_success()
+    breaker.record_failure(httpx.ConnectError("refused"))
+    assert breaker.state == "closed"
+
+def test_half_open_allows_one_trial_that_closes_on_success():
+    breaker = open_breaker(cooldown=0)
+    assert breaker.state == "half-open"
+    breaker.before_request()
+    with pytest.raises(TargetUnreachableError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_request()
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = open_breaker(cooldown=0)
+    breaker.before_request()
+    breaker.cooldown = 30
+    breaker.record_failure(httpx.ReadTimeout("stalled"))
+    assert breaker.state == "open"
+
+def test_released_trial_lets_another_through():
+    breaker = open_breaker(cooldown=0)
+    breaker.before_request()
+    breaker.release_trial()
+    breaker.before_request()
+
+def test_scan_budget_expires():
+    budget = ScanBudget(0.01)
+    budget.check()
+    time.sleep(0.02)
+    assert budget.remaining() < 0
+    with pytest.raises(ScanBudgetExceeded):
+        budget.check()
+
+def test_no_budget_when_disabled():
+    assert new_scan_budget(0) is None
+    assert new_scan_budget(5).seconds == 5
+
+def test_timeouts_are_clipped_to_the_budget():
+    token = current_budget.set(ScanBudget(1))
+    try:
+        timeout = request_timeout(read_timeout=30)
+        assert timeout.read <= 1 and timeout.connect <= 1
+        current_budget.get().deadline = time.monotonic() - 1
+        with pytest.raises(ScanBudgetExceeded):
+            request_timeout()
+    finally:
+        current_budget.reset(token)
@@ -0,0 +1,46 @@
+# backend/tests/test_rollups.py
+from datetime import datetime, timedelta
+from models import DashboardRollupDB
+from results_store import bulk_insert_results
+from rollups import backfill_rollups, dashboard_from_rollups, rebuild_rollups
+
+def sample_rows(make_result, user_id: int):
+    start = datetime(2024, 1, 30)
+    return [
+        make_result(
+            user_id, start + timedelta(days=index),
+            test_name=("sql", "xss", "ssrf")[index % 3],
+            api_type=("REST", "SOAP", "GraphQL")[index % 3],
+            vulnerable=index % 2 == 0,
+            confidence=(0.95, 0.75, 0.55, 0.2)[index % 4]
+        )
+        for index in range(12)
+    ]
+
+def test_incremental_rollups_match_a_rebuild(db, archive_dir, make_result):
+    # Inserted in several chunks, as scans arrive
+    bulk_insert_results(db, sample_rows(make_result, 1), batch_size=5)
+    bulk_insert_results(db, sample_rows(make_result, 2)[:4])
+    incremental = dashboard_from_rollups(db, 1)
+
+    rebuild_rollups(db)
+    db.commit()
+    assert dashboard_from_rollups(db, 1) == incremental
+    assert incremental["stats"]["total_tests"] == 12
+    assert incremental["stats"]["vulnerabilities"] == 6
+    assert sum(incremental["api_types"].values()) == 12
+    assert set(incremental["timeline"]) == {"2024-01", "2024-02"}
+
+def test_backfill_builds_missing_rollups_only(db, archive_dir, make_result):
+    bulk_insert_results(db, sample_rows(make_result, 1))
+    expected = dashboard_from_rollups(db, 1)
+    rebuild_rollups(db, 1)
+    db.commit()
+    assert backfill_rollups(db) == []
+
+    # Results from before the rollup table existed
+    db.query(DashboardRollupDB).delete()
+    db.commit()
+    assert dashboard_from_rollups(db, 1)["stats"]["total_tests"] == 0
+    assert backfill_rollups(db) == [1]
+    assert dashboard_from_rollups(db, 1) == expected
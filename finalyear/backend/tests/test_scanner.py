@@ -0,0 +1,32 @@
+# backend/tests/test_scanner.py
+import asyncio
+from models import APITestRequest, TestResult
+from security_tests.scanner import APISecurityScanner
+
+def test_concurrent_scans_share_the_global_limit():
+    running = 0
+    most_running = 0
+
+    async def slow_test(test_request: APITestRequest) -> TestResult:
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return TestResult(test_name="slow", vulnerable=False, confidence=0.0, description="", recommendation="")
+
+    def scanner() -> APISecurityScanner:
+        scanner = APISecurityScanner(max_concurrency=1, per_host_concurrency=4)
+        scanner.available_tests = {"REST": {"a": slow_test, "b": slow_test}}
+        return scanner
+
+    async def scan_both():
+        # Different hosts, so only the global limit can keep them apart
+        return await asyncio.gather(
+            scanner().run_tests(APITestRequest(api_type="REST", url="http://one.test/", tests=["a", "b"])),
+            scanner().run_tests(APITestRequest(api_type="REST", url="http://two.test/", tests=["a", "b"]))
+        )
+
+    results = asyncio.run(scan_both())
+    assert [len(scan) for scan in results] == [2, 2]
+    assert most_running == 1
@@ -0,0 +1,68 @@
+# backend/tests/test_throttle.py
+import asyncio
+import time
+from utils.throttle import AdaptiveConcurrency, HostThrottle, TokenBucket, retry_after_seconds
+
+def test_token_bucket_holds_the_rate_after_the_burst():
+    async def take(count):
+        bucket = TokenBucket(rate=100, burst=5)
+        started = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # The burst is free; the 20 requests after it need about 0.2 s at 100/s
+    elapsed = asyncio.run(take(25))
+    assert 0.18 <= elapsed < 1.0
+
+def test_token_bucket_pause_holds_requests():
+    async def paused():
+        bucket = TokenBucket(rate=0, burst=1)
+        bucket.pause(0.05)
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(paused()) >= 0.05
+
+def test_aimd_halves_on_overload_and_grows_back():
+    async def scenario():
+        limiter = AdaptiveConcurrency(max_limit=8, min_limit=1)
+        await limiter.acquire()
+        await limiter.release(latency=0.01, overloaded=True)
+        after_429 = limiter.limit
+        for _ in range(20):
+            await limiter.acquire()
+            await limiter.release(latency=0.01)
+        return after_429, limiter.limit
+
+    after_429, recovered = asyncio.run(scenario())
+    assert after_429 == 4
+    assert after_429 < recovered <= 8
+
+def test_one_decrease_per_round_trip():
+    async def burst_of_429s():
+        limiter = AdaptiveConcurrency(max_limit=8, min_limit=1)
+        for _ in range(4):
+            await limiter.acquire()
+        for _ in range(4):
+            await limiter.release(latency=1.0, overloaded=True)
+        return limiter.limit
+
+    assert asyncio.run(burst_of_429s()) == 4
+
+def test_host_throttle_honours_retry_after_on_429():
+    async def scenario():
+        throttle = HostThrottle(max_concurrency=4, rate=0)
+        await throttle.acquire()
+        await throttle.release(status_code=429, latency=0.01, retry_after="1")
+        return throttle
+
+    throttle = asyncio.run(scenario())
+    assert throttle.concurrency.limit == 2
+    assert throttle.bucket.paused_until > time.monotonic()
+
+def test_retry_after_parsing():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("soon") is None
@@ -0,0 +1,52 @@
+# backend/tests/test_timing.py
+import asyncio
+from datetime import timedelta
+import httpx
+from security_tests.baseline import Baseline
+from security_tests.timing import MIN_CONFIRMATIONS, TimingOracle
+
+def oracle(latencies=(0.1, 0.1, 0.1)) -> TimingOracle:
+    baseline = Baseline(200, "", {})
+    baseline.add_latencies(list(latencies))
+    return TimingOracle(baseline)
+
+def sender(latencies):
+    """send() for is_delayed that answers with the given latencies in turn"""
+    remaining = iter(latencies)
+
+    async def send():
+        response = httpx.Response(200)
+        response.elapsed = timedelta(seconds=next(remaining))
+        return response
+    return send
+
+def test_clean_payload_is_rejected_after_one_sample():
+    delayed, samples = asyncio.run(oracle().is_delayed(sender([0.1] * 5), delay=1))
+    assert not delayed
+    assert samples == [0.1]
+
+def test_delayed_payload_needs_min_confirmations():
+    delayed, samples = asyncio.run(oracle().is_delayed(sender([1.1] * 5), delay=1))
+    assert delayed
+    assert len(samples) == MIN_CONFIRMATIONS
+
+def test_single_outlier_is_capped_at_max_step():
+    timing = oracle()
+    assert timing.evidence(60.0, delay=1) == timing.max_step
+    assert timing.max_step < timing.accept_delayed
+    # One huge spike followed by clean samples is not a finding
+    delayed, samples = asyncio.run(timing.is_delayed(sender([60.0, 0.1, 0.1, 0.1, 0.1]), delay=1))
+    assert not delayed
+    assert len(samples) > 1
+
+def test_inconclusive_samples_are_not_reported():
+    timing = oracle()
+    # Half the delay scores zero evidence either way
+    delayed, samples = asyncio.run(timing.is_delayed(sender([0.6] * timing.max_samples), delay=1))
+    assert not delayed
+    assert len(samples) == timing.max_samples
+
+def test_sleep_clears_the_baseline_jitter():
+    assert oracle().sleep_seconds() >= 1
+    noisy = oracle([0.1, 0.5, 0.1, 0.5])
+    assert noisy.sleep_seconds() >= 10 * noisy.jitter
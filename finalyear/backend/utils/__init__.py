@@ -1,4 +1,8 @@
 # utils/__init__.py
-from .api_client import make_api_request
+from .api_client import make_api_request, client_manager, HTTPClientManager
+from .request_policy import ProbeAbortedError, TargetUnreachableError, ScanBudgetExceeded
 
-__all__ = ["make_api_request"]
\ No newline at end of file
+__all__ = [
+    "make_api_request", "client_manager", "HTTPClientManager",
+    "ProbeAbortedError", "TargetUnreachableError", "ScanBudgetExceeded"
+]
\ No newline at end of file
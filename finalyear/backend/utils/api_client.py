@@ -1,5 +1,174 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import time
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+from .logging_config import should_trace
+from .metrics import (
+    REQUESTS_IN_FLIGHT, REQUESTS_SENT, REQUEST_LATENCY, REQUEST_RETRIES_TOTAL, RESPONSE_BYTES, current_test_bytes,
+    request_outcome
+)
+from .throttle import HostThrottle
+from .tracing import Span, http_trace_hook, span
+from .request_policy import (
+    CIRCUIT_ERRORS, REQUEST_RETRIES, RETRYABLE_ERRORS, CircuitBreaker, ScanBudgetExceeded,
+    TargetUnreachableError, current_budget, request_timeout, retry_delay
+)
+
+logger = logging.getLogger(__name__)
+
+# Connection pool settings (overridable from the environment)
+MAX_CONNECTIONS = int(os.getenv("SCANNER_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SCANNER_MAX_KEEPALIVE_CONNECTIONS", "20"))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("SCANNER_MAX_CONNECTIONS_PER_HOST", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("SCANNER_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2 needs the optional "h2" package (pip install httpx[http2])
+HTTP2_ENABLED = os.getenv("SCANNER_HTTP2", "false").lower() in ("1", "true", "yes")
+
+
+class HTTPClientManager:
+    """Owns the shared httpx.AsyncClient so every test module reuses warm connections"""
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+        http2: bool = HTTP2_ENABLED
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_throttles: Dict[str, HostThrottle] = {}
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+    async def start(self) -> httpx.AsyncClient:
+        """Open the pooled client (called on app startup, or lazily on first request)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, http2=self.http2)
+        return self._client
+
+    async def close(self):
+        """Close pooled connections (called on app shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._host_throttles.clear()
+        self._circuit_breakers.clear()
+
+    async def get_client(self) -> httpx.AsyncClient:
+        return await self.start()
+
+    def host_throttle(self, url: str) -> HostThrottle:
+        """Rate and adaptive concurrency limits for one host (see utils/throttle.py)"""
+        host = urlsplit(url).netloc.lower()
+        throttle = self._host_throttles.get(host)
+        if throttle is None:
+            throttle = HostThrottle(self.max_connections_per_host)
+            self._host_throttles[host] = throttle
+        return throttle
+
+    def circuit_breaker(self, url: str) -> CircuitBreaker:
+        """Failure tracking for one host, shared by every scan in this process"""
+        host = urlsplit(url).netloc.lower()
+        breaker = self._circuit_breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            self._circuit_breakers[host] = breaker
+        return breaker
+
+
+# Process-wide client manager, started/stopped with the FastAPI app
+client_manager = HTTPClientManager()
+
+
+async def send_once(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]],
+    params: Optional[Dict[str, str]],
+    body: Any,
+    timeout: httpx.Timeout,
+    throttle: bool
+) -> httpx.Response:
+    """One attempt, inside the host's politeness limits"""
+    with span(f"{method} {urlsplit(url).path or '/'}", "http", url=url) as request_span:
+        response = await _send_once(client, method, url, headers, params, body, timeout, throttle, request_span)
+        if request_span:
+            request_span.attrs["status"] = response.status_code
+        return response
+
+
+async def _send_once(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]],
+    params: Optional[Dict[str, str]],
+    body: Any,
+    timeout: httpx.Timeout,
+    throttle: bool,
+    request_span: Optional[Span]
+) -> httpx.Response:
+    host_throttle = client_manager.host_throttle(url) if throttle else None
+    if host_throttle:
+        queued = time.perf_counter()
+        await host_throttle.acquire()
+        if request_span:
+            request_span.attrs["throttle_wait_ms"] = round((time.perf_counter() - queued) * 1000, 3)
+    # Connection phase timings (connect, TLS, first byte) for traced scans
+    hook = http_trace_hook() if request_span else None
+    response = None
+    timed_out = False
+    started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await client.request(
+            method=method,
+            url=url,
+            headers=headers or {},
+            params=params or {},
+            json=body if body else None,
+            timeout=timeout,
+            extensions={"trace": hook} if hook else None
+        )
+        size = len(response.content)
+        RESPONSE_BYTES.observe(size, method=method)
+        test_bytes = current_test_bytes.get()
+        if test_bytes is not None:
+            test_bytes[0] += size
+        REQUESTS_SENT.inc(method=method, outcome=request_outcome(response.status_code))
+        return response
+    except httpx.TimeoutException as e:
+        timed_out = True
+        # Time on the wire only (no throttle wait), like response.elapsed for answered requests
+        e.network_latency = time.perf_counter() - started
+        REQUESTS_SENT.inc(method=method, outcome=request_outcome(error=e))
+        raise
+    except Exception as e:
+        REQUESTS_SENT.inc(method=method, outcome=request_outcome(error=e))
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        REQUEST_LATENCY.observe(time.perf_counter() - started, method=method)
+        if host_throttle:
+            await host_throttle.release(
+                status_code=response.status_code if response is not None else None,
+                latency=time.perf_counter() - started if response is not None else None,
+                retry_after=response.headers.get("retry-after") if response is not None else None,
+                timed_out=timed_out
+            )
+
 
 async def make_api_request(
     method: str,
@@ -7,29 +176,72 @@ async def make_api_request(
     headers: Dict[str, str] = None,
     params: Dict[str, str] = None,
     body: Any = None,
-    timeout: int = 30
+    timeout: Optional[float] = None,
+    throttle: bool = True,
+    retries: Optional[int] = None
 ) -> httpx.Response:
-    print(f"\nMaking {method} request to {url}")  # Debug
-    print(f"Headers: {headers}")  # Debug
-    print(f"Params: {params}")  # Debug
-    print(f"Body: {body}")  # Debug
-    
+    """Send one request through the shared pool.
+
+    timeout overrides the read timeout (SCANNER_READ_TIMEOUT); connect and read
+    timeouts are clipped to the scan's remaining time budget. Transient network
+    errors are retried with jittered backoff, and requests to a host whose
+    circuit is open fail fast with TargetUnreachableError (see
+    utils/request_policy.py).
+
+    throttle=False skips the per-host politeness limits; only load tests that
+    measure the target's own rate limiting should use it.
+    """
+    # Sampled once per request so its request and response records stay together
+    traced = should_trace(logger)
+    if traced:
+        logger.debug("request", extra={
+            "method": method, "url": url, "headers": dict(headers or {}), "params": dict(params or {}), "body": body
+        })
+
+    retries = REQUEST_RETRIES if retries is None else retries
+    breaker = client_manager.circuit_breaker(url)
+    budget = current_budget.get()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=headers or {},
-                params=params or {},
-                json=body if body else None,
-                timeout=timeout
-            )
-            
-            print(f"Response status: {response.status_code}")  # Debug
-            print(f"Response headers: {response.headers}")  # Debug
-            print(f"Response body (first 500 chars): {response.text[:500]}")  # Debug
-            
-            return response
+        client = await client_manager.get_client()
+        for attempt in range(retries + 1):
+            request_timeouts = request_timeout(timeout)
+            breaker.before_request()
+            try:
+                response = await send_once(client, method, url, headers, params, body, request_timeouts, throttle)
+            except CIRCUIT_ERRORS as e:
+                if budget is not None and isinstance(e, httpx.TimeoutException) and budget.remaining() <= 0:
+                    # Cut short by the budget, not by the target
+                    breaker.release_trial()
+                    raise ScanBudgetExceeded(budget.seconds) from e
+                breaker.record_failure(e)
+                if breaker.state != "closed":
+                    raise TargetUnreachableError(breaker.host, breaker.last_error) from e
+                if attempt == retries or not isinstance(e, RETRYABLE_ERRORS):
+                    raise
+                REQUEST_RETRIES_TOTAL.inc(error=type(e).__name__)
+                delay = retry_delay(attempt)
+                if budget is not None:
+                    delay = min(delay, max(0.0, budget.remaining()))
+                logger.warning("retrying request", extra={
+                    "method": method, "url": url, "attempt": attempt + 1, "delay": round(delay, 3), "error": type(e).__name__
+                })
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            break
+
+        if traced:
+            logger.debug("response", extra={
+                "method": method, "url": url, "status": response.status_code,
+                "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1),
+                "response_headers": dict(response.headers), "body_preview": response.text[:500]
+            })
+
+        return response
     except Exception as e:
-        print(f"Request failed: {str(e)}")  # Debug
-        raise
\ No newline at end of file
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("request failed", extra={"method": method, "url": url, "error": f"{type(e).__name__}: {e}"})
+        raise
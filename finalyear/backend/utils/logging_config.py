@@ -0,0 +1,121 @@
+# utils/logging_config.py
+"""
+Structured, non-blocking logging for the backend.
+
+configure_logging() routes every logger through a QueueHandler; a
+QueueListener thread does the formatting (one JSON object per line),
+redaction and writing, so the event loop never waits on stdout.
+
+Per-request tracing (headers, params, bodies) is logged at DEBUG and only for
+a sample of requests; with LOG_LEVEL above DEBUG, should_trace() is a single
+cached level check. Credentials (Authorization, cookies, API keys, password
+or token fields) are redacted before anything is written.
+
+    LOG_LEVEL=DEBUG SCANNER_TRACE_SAMPLE_RATE=0.05   # trace 5% of requests
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Share of requests whose full details are traced when DEBUG is enabled
+TRACE_SAMPLE_RATE = float(os.getenv("SCANNER_TRACE_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+REDACTED = "[redacted]"
+SENSITIVE_HEADERS = {"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key", "x-auth-token"}
+SENSITIVE_FIELDS = {"password", "passwd", "token", "access_token", "refresh_token", "api_key", "apikey", "secret", "client_secret"}
+# Standard LogRecord attributes; anything else passed through extra= is a field
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def redact(value: Any, key: str = "") -> Any:
+    """Copy of value with credential-bearing headers and fields masked"""
+    lowered = key.lower()
+    if lowered in SENSITIVE_HEADERS or lowered in SENSITIVE_FIELDS:
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: redact(v, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+def should_trace(logger: logging.Logger) -> bool:
+    """Whether to log full details for this request (decide once per request)"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    return TRACE_SAMPLE_RATE >= 1 or random.random() < TRACE_SAMPLE_RATE
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = redact(value, key)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class DropWhenFullQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the writer falls behind, records are dropped"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the message; formatting and redaction happen on the listener thread
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+def configure_logging(level: str = LOG_LEVEL):
+    """Install the queue handler on the root logger (safe to call more than once)"""
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JSONFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(DropWhenFullQueueHandler(log_queue))
+    root.setLevel(level)
+    # Per-connection logs from the HTTP stack would swamp the scanner's own
+    for noisy in ("httpx", "httpcore", "hpack"):
+        logging.getLogger(noisy).setLevel(max(logging.WARNING, root.level))
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,189 @@
+# utils/metrics.py
+"""
+Process-wide scanner metrics in the Prometheus text format.
+
+Counter, Gauge and Histogram cover what the scanner records; REGISTRY.render()
+produces the /metrics payload. Each worker process keeps its own values
+(scrape every uvicorn worker, or sum them in Prometheus).
+"""
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Seconds, for request latency and test wall time
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def total(self, **labels: str) -> float:
+        """Sum over every label set matching the given labels"""
+        wanted = [(self.labelnames.index(name), str(value)) for name, value in labels.items()]
+        with self._lock:
+            return sum(value for key, value in self._values.items() if all(key[i] == v for i, v in wanted))
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the (unlabelled) value from function at scrape time"""
+        self._function = function
+
+    def samples(self) -> Iterable[str]:
+        if self._function is not None:
+            yield f"{self.name} {_number(self._function())}"
+            return
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: [count per bucket..., sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            counts[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(counts[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+REGISTRY = Registry()
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+# Request layer (utils/api_client.py)
+REQUESTS_SENT = counter("scanner_requests_total", "Probe requests sent, by method and outcome", ("method", "outcome"))
+REQUEST_LATENCY = histogram("scanner_request_duration_seconds", "Probe request latency", ("method",))
+RESPONSE_BYTES = histogram("scanner_response_bytes", "Size of probe response bodies", ("method",), SIZE_BUCKETS)
+REQUESTS_IN_FLIGHT = gauge("scanner_requests_in_flight", "Probe requests currently waiting on a target")
+REQUEST_RETRIES_TOTAL = counter("scanner_request_retries_total", "Probe requests retried after a transient error", ("error",))
+
+# Tests and scans (security_tests/scanner.py)
+TEST_RESULTS = counter("scanner_test_results_total", "Finished tests, by test and outcome", ("api_type", "test", "outcome"))
+TEST_DURATION = histogram("scanner_test_duration_seconds", "Wall time of one test against one target", ("api_type", "test"))
+TEST_BYTES = histogram("scanner_test_bytes", "Response bytes downloaded by one test against one target", ("api_type", "test"), SIZE_BUCKETS)
+SCANS_IN_PROGRESS = gauge("scanner_scans_in_progress", "Targets currently being scanned")
+
+# Background jobs (jobs.py)
+JOBS_QUEUED = gauge("scanner_jobs_queued", "Scan jobs waiting for a worker")
+JOBS_RUNNING = gauge("scanner_jobs_running", "Scan jobs currently running")
+
+# Bytes downloaded by the current test; set by the scanner around each test
+current_test_bytes: ContextVar[Optional[List[int]]] = ContextVar("current_test_bytes", default=None)
+
+def request_outcome(status_code: Optional[int] = None, error: Optional[BaseException] = None) -> str:
+    """Low-cardinality outcome label: 2xx/3xx/4xx/5xx or the error class"""
+    if error is not None:
+        return type(error).__name__
+    return f"{status_code // 100}xx"
@@ -0,0 +1,135 @@
+# utils/request_policy.py
+"""
+Failure handling for outgoing scanner requests.
+
+  - separate connect and read timeouts, both clipped to the scan's time budget
+  - jittered exponential-backoff retries for transient network errors
+  - a per-host circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive
+    failures the host is treated as down and requests fail fast with
+    TargetUnreachableError until CIRCUIT_COOLDOWN has passed, when a single
+    trial request decides whether it closes again
+
+Tests let ProbeAbortedError propagate so the scanner can report the target as
+unreachable (or out of time) instead of "not vulnerable".
+"""
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Optional
+import httpx
+
+CONNECT_TIMEOUT = float(os.getenv("SCANNER_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("SCANNER_READ_TIMEOUT", "30"))
+# Extra attempts after a transient network error, and the backoff between them
+REQUEST_RETRIES = int(os.getenv("SCANNER_REQUEST_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("SCANNER_RETRY_BACKOFF", "0.5"))
+RETRY_BACKOFF_MAX = float(os.getenv("SCANNER_RETRY_BACKOFF_MAX", "5"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("SCANNER_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_COOLDOWN = float(os.getenv("SCANNER_CIRCUIT_COOLDOWN", "30"))
+# Default wall-clock budget for all tests of one scan, in seconds (0 = unlimited)
+SCAN_TIME_BUDGET = float(os.getenv("SCAN_TIME_BUDGET", "600"))
+
+# Failed before the target sent a response; safe to retry
+RETRYABLE_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+)
+# Count towards opening the circuit (a read timeout means the host stalled)
+CIRCUIT_ERRORS = RETRYABLE_ERRORS + (httpx.ReadTimeout,)
+
+class ProbeAbortedError(Exception):
+    """A request was not attempted or could not complete for reasons outside the test"""
+
+class TargetUnreachableError(ProbeAbortedError):
+    def __init__(self, host: str, reason: str):
+        super().__init__(f"Target {host} is unreachable: {reason}")
+        self.host = host
+        self.reason = reason
+
+class ScanBudgetExceeded(ProbeAbortedError):
+    def __init__(self, budget: float):
+        super().__init__(f"Scan time budget of {budget:.0f}s exhausted")
+        self.budget = budget
+
+class ScanBudget:
+    """Wall-clock deadline shared by every request of one scan"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def check(self):
+        if self.remaining() <= 0:
+            raise ScanBudgetExceeded(self.seconds)
+
+# Set by the scanner for the duration of a scan; None means no budget
+current_budget: ContextVar[Optional[ScanBudget]] = ContextVar("current_budget", default=None)
+
+def new_scan_budget(seconds: Optional[float] = None) -> Optional[ScanBudget]:
+    seconds = SCAN_TIME_BUDGET if seconds is None else seconds
+    return ScanBudget(seconds) if seconds > 0 else None
+
+def request_timeout(read_timeout: Optional[float] = None) -> httpx.Timeout:
+    """Connect/read timeouts for one attempt, clipped to the scan's remaining budget"""
+    read = READ_TIMEOUT if read_timeout is None else read_timeout
+    connect = CONNECT_TIMEOUT
+    budget = current_budget.get()
+    if budget is not None:
+        budget.check()
+        remaining = budget.remaining()
+        read, connect = min(read, remaining), min(connect, remaining)
+    return httpx.Timeout(read, connect=connect, pool=read)
+
+def retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number attempt (0-based)"""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open trial -> closed"""
+
+    def __init__(self, host: str, threshold: int = CIRCUIT_FAILURE_THRESHOLD, cooldown: float = CIRCUIT_COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error = ""
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def before_request(self):
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            raise TargetUnreachableError(self.host, f"{self.failures} consecutive failures ({self.last_error})")
+        if state == "half-open":
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self, error: Exception):
+        self.failures += 1
+        self.last_error = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+        if self._trial_in_flight or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        """A half-open trial ended without telling us anything about the host"""
+        self._trial_in_flight = False
@@ -0,0 +1,148 @@
+# utils/throttle.py
+"""
+Per-host politeness for outgoing scanner requests.
+
+Each target host gets a HostThrottle combining:
+  - a token bucket capping the request rate (plus pauses requested with Retry-After)
+  - an AIMD concurrency limit: +1 per round trip while the host keeps up,
+    halved (at most once per round trip) on 429/503, timeouts, or latency
+    rising well above the fastest latency seen for that host
+
+Different hosts never wait on each other, so aggregate throughput scales with
+the number of targets while no single target gets hammered.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Requests per second per host (0 = no rate cap) and how many may burst at once
+HOST_RATE = float(os.getenv("SCANNER_HOST_RPS", "50"))
+HOST_BURST = int(os.getenv("SCANNER_HOST_BURST", "10"))
+# Concurrency never drops below this many requests per host
+MIN_CONCURRENCY_PER_HOST = int(os.getenv("SCANNER_MIN_CONNECTIONS_PER_HOST", "1"))
+# Smoothed latency above this multiple of the fastest seen counts as congestion
+LATENCY_TOLERANCE = float(os.getenv("SCANNER_LATENCY_TOLERANCE", "2.0"))
+# Longest pause honoured from a Retry-After header, in seconds
+RETRY_AFTER_CAP = float(os.getenv("SCANNER_RETRY_AFTER_CAP", "60"))
+
+OVERLOAD_STATUSES = {429, 503}
+# Lets the fastest-latency floor drift up slowly if the host gets slower for good
+MIN_LATENCY_DRIFT = 1.01
+LATENCY_SMOOTHING = 0.2
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class TokenBucket:
+    """Rate limiter; waiters are served in arrival order"""
+
+    def __init__(self, rate: float = HOST_RATE, burst: int = HOST_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Hold all requests for seconds (e.g. from Retry-After)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + min(seconds, RETRY_AFTER_CAP))
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests, driven by latency and overload signals"""
+
+    def __init__(self, max_limit: int, min_limit: int = MIN_CONCURRENCY_PER_HOST, tolerance: float = LATENCY_TOLERANCE):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.tolerance = tolerance
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.min_latency: Optional[float] = None
+        self.smoothed_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float] = None, overloaded: bool = False):
+        async with self._condition:
+            self.in_flight -= 1
+            self._adjust(latency, overloaded)
+            self._condition.notify_all()
+
+    def _adjust(self, latency: Optional[float], overloaded: bool):
+        if latency is not None:
+            self.min_latency = latency if self.min_latency is None else min(latency, self.min_latency * MIN_LATENCY_DRIFT)
+            self.smoothed_latency = latency if self.smoothed_latency is None else (
+                (1 - LATENCY_SMOOTHING) * self.smoothed_latency + LATENCY_SMOOTHING * latency
+            )
+        congested = overloaded or (
+            self.smoothed_latency is not None and self.smoothed_latency > self.min_latency * self.tolerance
+        )
+        now = time.monotonic()
+        if congested:
+            # One multiplicative decrease per round trip, not one per in-flight response
+            if now - self._last_decrease >= (self.smoothed_latency or 0):
+                self.limit = max(float(self.min_limit), self.limit / 2)
+                self._last_decrease = now
+        elif latency is not None:
+            # Additive increase: roughly +1 per round trip's worth of responses
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+class HostThrottle:
+    """Rate and concurrency control for one host"""
+
+    def __init__(self, max_concurrency: int, rate: float = HOST_RATE, burst: int = HOST_BURST):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+
+    async def acquire(self):
+        await self.concurrency.acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            await self.concurrency.release()
+            raise
+
+    async def release(self, status_code: Optional[int] = None, latency: Optional[float] = None,
+                      retry_after: Optional[str] = None, timed_out: bool = False):
+        overloaded = timed_out or status_code in OVERLOAD_STATUSES
+        if status_code in OVERLOAD_STATUSES:
+            wait = retry_after_seconds(retry_after)
+            if wait:
+                self.bucket.pause(wait)
+        await self.concurrency.release(None if timed_out else latency, overloaded)
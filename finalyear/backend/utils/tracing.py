@@ -0,0 +1,211 @@
+# utils/tracing.py
+"""
+Optional per-scan execution traces.
+
+A ScanTrace records a span tree: scan -> test -> payload -> HTTP request ->
+connection phases (from httpcore's trace extension: TCP connect, which also
+covers DNS, TLS handshake, sending the request, waiting for the first byte
+and reading the body). Detector functions decorated with @detector record
+their wall and CPU time for a sample of calls.
+
+Tracing is off unless a scan asks for it (APITestRequest.trace); every hook
+then costs one ContextVar lookup. to_chrome() exports the Chrome trace event
+format, which chrome://tracing, Perfetto and speedscope show as a timeline or
+flame chart.
+"""
+import asyncio
+import functools
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Share of detector calls whose CPU time is recorded while tracing
+DETECTOR_SAMPLE_RATE = float(os.getenv("TRACE_DETECTOR_SAMPLE_RATE", "0.25"))
+# A trace stops recording new spans past this many, to bound its size
+MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "50000"))
+
+class Span:
+    __slots__ = ("trace", "name", "category", "start_ns", "end_ns", "lane", "attrs", "cpu_ns")
+
+    def __init__(self, trace: "ScanTrace", name: str, category: str, lane: int, attrs: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.category = category
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.lane = lane
+        self.attrs = attrs
+        self.cpu_ns: Optional[int] = None
+
+    @property
+    def duration_ns(self) -> int:
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+
+    def finish(self):
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+
+class ScanTrace:
+    """Spans of one scan of one target"""
+
+    def __init__(self, name: str, **attrs: Any):
+        self.id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lanes: Dict[int, int] = {}
+        self.root = self.add_span(name, "scan", attrs)
+
+    def lane(self) -> int:
+        """Timeline row for the current asyncio task (spans of one task nest cleanly)"""
+        try:
+            task_id = id(asyncio.current_task())
+        except RuntimeError:
+            task_id = 0
+        return self._lanes.setdefault(task_id, len(self._lanes) + 1)
+
+    def add_span(self, name: str, category: str, attrs: Dict[str, Any]) -> Optional[Span]:
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return None
+        span = Span(self, name, category, self.lane(), attrs)
+        self.spans.append(span)
+        return span
+
+    def finish(self):
+        self.root.finish()
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ns / 1e6
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Chrome trace event format ("X" complete events, microseconds)"""
+        origin = self.root.start_ns
+        events = []
+        for span in self.spans:
+            args = dict(span.attrs)
+            if span.cpu_ns is not None:
+                args["cpu_ms"] = round(span.cpu_ns / 1e6, 3)
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start_ns - origin) / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": 1,
+                "tid": span.lane,
+                "args": args
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.id, "dropped_spans": self.dropped}
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Where the time went: totals per category plus the slowest spans"""
+        return summarize_chrome(self.to_chrome())
+
+def summarize_chrome(chrome: Dict[str, Any], top: int = 20) -> Dict[str, Any]:
+    """Totals per category and the slowest spans of a Chrome-format trace"""
+    events = chrome.get("traceEvents", [])
+    by_category: Dict[str, Dict[str, float]] = {}
+    for event in events:
+        totals = by_category.setdefault(event["cat"], {"count": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+        totals["count"] += 1
+        totals["wall_ms"] += event["dur"] / 1000
+        totals["cpu_ms"] += event["args"].get("cpu_ms", 0.0)
+    scan = next((event for event in events if event["cat"] == "scan"), None)
+    slowest = sorted((event for event in events if event["cat"] != "scan"), key=lambda event: event["dur"], reverse=True)
+    return {
+        "trace_id": chrome.get("otherData", {}).get("trace_id"),
+        "duration_ms": scan["dur"] / 1000 if scan else 0.0,
+        "categories": {
+            category: {key: round(value, 3) for key, value in totals.items()}
+            for category, totals in by_category.items()
+        },
+        "slowest": [
+            {"name": event["name"], "category": event["cat"], "ms": round(event["dur"] / 1000, 3), "args": event["args"]}
+            for event in slowest[:top]
+        ]
+    }
+
+# Innermost open span of the current task; None when the scan is not traced
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+@contextmanager
+def span(name: str, category: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Record a child of the current span (no-op when not tracing)"""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.trace.add_span(name, category, attrs)
+    if child is None:
+        yield None
+        return
+    token = current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.finish()
+        current_span.reset(token)
+
+@contextmanager
+def start_trace(trace: Optional[ScanTrace]) -> Iterator[Optional[ScanTrace]]:
+    """Make trace's root span current for the scan (no-op for None)"""
+    if trace is None:
+        yield None
+        return
+    token = current_span.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        current_span.reset(token)
+
+def http_trace_hook() -> Optional[Callable]:
+    """httpcore "trace" extension recording connection phases under the current span"""
+    parent = current_span.get()
+    if parent is None:
+        return None
+    started: Dict[str, Span] = {}
+
+    async def hook(event_name: str, info: Dict[str, Any]):
+        phase, _, stage = event_name.rpartition(".")
+        if stage == "started":
+            child = parent.trace.add_span(phase, "http.phase", {})
+            if child is not None:
+                started[phase] = child
+        elif stage in ("complete", "failed"):
+            child = started.pop(phase, None)
+            if child is not None:
+                child.finish()
+                if stage == "failed":
+                    child.attrs["failed"] = True
+
+    return hook
+
+def detector(name: str):
+    """Record wall and CPU time of a sampled share of calls while tracing"""
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            parent = current_span.get()
+            if parent is None or random.random() >= DETECTOR_SAMPLE_RATE:
+                return function(*args, **kwargs)
+            child = parent.trace.add_span(name, "detector", {})
+            if child is None:
+                return function(*args, **kwargs)
+            cpu_start = time.thread_time_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                child.cpu_ns = time.thread_time_ns() - cpu_start
+                child.finish()
+        return wrapper
+    return decorate